@@ -1,19 +1,31 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 import asyncio
+import hashlib
+import logging
 import os
 import time
+import uuid
+import orjson
 
 from app.models.search_models import SearchFilters, SearchRequest, SearchResult, SearchResponse
 from app.services.gpt_service import enhance_query
 from app.services.ebay_service import search_ebay
 from app.services.etsy_service import search_etsy
 from app.services.hippostcard_service import search_hippostcard
-from app.services.image_analysis_service import analyze_image, download_image, extract_text_from_image
+from app.services.image_analysis_service import (
+    MAX_IMAGES_PER_REQUEST, ImageDownloadError, analyze_images_batch, canonical_url,
+    download_and_extract_text, image_text_cache
+)
+from app.services import ocr_cache, ocr_queue
 from app.utils.aggregator import aggregate_results, filter_results_by_image_text
+from app.utils.cache import TTLCache
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 # Create a semaphore to limit concurrent API calls to OpenAI
 # This helps prevent rate limiting errors
 MAX_CONCURRENT_REQUESTS = 5  # Adjust based on OpenAI rate limits and your account tier
@@ -26,11 +38,32 @@ MAX_POSTCARDS_TO_PROCESS = 50  # Reduced from 100 to 50 for faster processing
 # Maximum time (in seconds) to spend on image processing before timing out
 IMAGE_PROCESSING_TIMEOUT = 60
 
-# Track which image URLs have already been processed to avoid duplicates
-processed_images = set()
+# Maximum time (in seconds) to wait on a single marketplace search
+MARKETPLACE_SEARCH_TIMEOUT = 20
+
+# Recent searches by search_id, so clients can poll for image text that is
+# extracted after the response is sent
+SEARCH_SESSION_TTL = 600  # seconds
+_search_sessions = TTLCache(maxsize=1000, ttl=SEARCH_SESSION_TTL)
+
+# Recent responses by request, so refreshes and repeated pagination skip the
+# marketplace and GPT calls. Clients get the same search_id back.
+SEARCH_RESPONSE_CACHE_TTL = 60  # seconds
+_search_response_cache = TTLCache(maxsize=1000, ttl=SEARCH_RESPONSE_CACHE_TTL)
+
+# Searches whose image text was handed to the OCR queue workers, with the
+# time they were queued; their text is picked up from the shared OCR cache
+_queued_searches = TTLCache(maxsize=1000, ttl=SEARCH_SESSION_TTL)
+
+# Images recently found to have no text. Extracted text itself lives in
+# image_analysis_service.image_text_cache, which only holds successes; this
+# keeps no-text images from going to Redis and the Vision API on every
+# search, while the short TTL still retries transient failures.
+NO_TEXT_CACHE_TTL = 600  # seconds
+_no_text_urls = TTLCache(maxsize=20000, ttl=NO_TEXT_CACHE_TTL)
 
 @router.post("/search", response_model=SearchResponse)
-async def search_postcards(request: SearchRequest, background_tasks: BackgroundTasks = None):
+async def search_postcards(request: SearchRequest, background_tasks: BackgroundTasks):
     """
     Search for postcards across multiple services.
     
@@ -40,66 +73,48 @@ async def search_postcards(request: SearchRequest, background_tasks: BackgroundT
     Returns:
         Combined search results from all services
     """
+    cache_key = request.model_dump_json()
+    cached_response = _search_response_cache.get(cache_key)
+    if cached_response is not None:
+        logger.debug("Serving cached results for query: %s", request.query)
+        return cached_response
+    
     try:
-        print(f"DEBUG: Starting search for query: {request.query}")
+        logger.debug("Starting search for query: %s", request.query)
         
-        # Get raw results from each service
-        try:
-            ebay_results = await search_ebay(
-                request.query, 
-                request.filters, 
-                request.page, 
-                request.limit
-            )
-            print(f"DEBUG: Got {len(ebay_results)} results from eBay")
-        except Exception as e:
-            print(f"DEBUG: Error in eBay search: {str(e)}")
-            ebay_results = []
+        # Query all marketplaces and enhance the query concurrently, so their
+        # network latency overlaps instead of adding up
+        ebay_results, etsy_results, hippostcard_results, enhanced_query = await asyncio.gather(
+            asyncio.wait_for(
+                search_ebay(request.query, request.filters, request.page, request.limit),
+                timeout=MARKETPLACE_SEARCH_TIMEOUT
+            ),
+            asyncio.wait_for(
+                search_etsy(request.query, request.filters, request.page, request.limit),
+                timeout=MARKETPLACE_SEARCH_TIMEOUT
+            ),
+            asyncio.wait_for(
+                search_hippostcard(request.query, request.filters, request.page, request.limit),
+                timeout=MARKETPLACE_SEARCH_TIMEOUT
+            ),
+            asyncio.wait_for(enhance_query(request.query), timeout=MARKETPLACE_SEARCH_TIMEOUT),
+            return_exceptions=True
+        )
         
-        try:
-            etsy_results = await search_etsy(
-                request.query, 
-                request.filters, 
-                request.page, 
-                request.limit
-            )
-            print(f"DEBUG: Got {len(etsy_results)} results from Etsy")
-        except Exception as e:
-            print(f"DEBUG: Error in Etsy search: {str(e)}")
-            etsy_results = []
+        # A failing source shouldn't fail the whole search - keep partial results
+        ebay_results = _results_or_empty(ebay_results, "eBay")
+        etsy_results = _results_or_empty(etsy_results, "Etsy")
+        hippostcard_results = _results_or_empty(hippostcard_results, "HipPostcard")
         
-        try:
-            hippostcard_results = await search_hippostcard(
-                request.query, 
-                request.filters, 
-                request.page, 
-                request.limit
-            )
-            print(f"DEBUG: Got {len(hippostcard_results)} results from HipPostcard")
-        except Exception as e:
-            print(f"DEBUG: Error in HipPostcard search: {str(e)}")
-            hippostcard_results = []
-        
-        # Enhance query using GPT-4 (if available)
-        try:
-            enhanced_query = await enhance_query(request.query)
-            print(f"DEBUG: Enhanced query: {enhanced_query}")
-        except Exception as e:
-            print(f"DEBUG: Error enhancing query: {str(e)}")
+        if isinstance(enhanced_query, BaseException):
+            logger.warning("Error enhancing query: %s", enhanced_query)
             enhanced_query = None
+        else:
+            logger.debug("Enhanced query: %s", enhanced_query)
         
         # Combine and sort results
         all_results = ebay_results + etsy_results + hippostcard_results
-        print(f"DEBUG: Total combined results: {len(all_results)}")
-        
-        # Initialize text extraction fields to undefined to show loading state
-        for result in all_results:
-            # Explicitly set to undefined by not setting a value
-            # This ensures the frontend will show "Extracting text..." instead of "No text detected"
-            if hasattr(result, 'image_text'):
-                delattr(result, 'image_text')
-            if hasattr(result, 'additional_image_text'):
-                delattr(result, 'additional_image_text')
+        logger.debug("Total combined results: %d", len(all_results))
         
         # Apply filters and sorting via the aggregator
         aggregated_results = aggregate_results(
@@ -107,47 +122,20 @@ async def search_postcards(request: SearchRequest, background_tasks: BackgroundT
             request.filters,
             sort_by=request.filters.sort_by if request.filters else "relevance"
         )
-        print(f"DEBUG: Number of aggregated results after filtering: {len(aggregated_results)}")
-        
-        # Process first batch of images immediately for better user experience
-        if aggregated_results:
-            print("DEBUG: Processing first batch of images immediately for better user experience")
-            # Process the front and back of the first few postcards immediately
-            immediate_processing_limit = min(10, len(aggregated_results))
-            immediate_batch = aggregated_results[:immediate_processing_limit]
-            print(f"DEBUG: Immediately processing {immediate_processing_limit} postcards")
-            
-            # Create tasks for immediate processing
-            immediate_tasks = []
-            
-            for result in immediate_batch:
-                # Process main image (front of postcard)
-                if result.image_url:
-                    immediate_tasks.append(analyze_main_image(result))
-                    print(f"DEBUG: Added task for front image: {result.title[:30]}...")
-                
-                # Process first additional image if available (back of postcard)
-                if result.additional_images and len(result.additional_images) > 0:
-                    immediate_tasks.append(analyze_additional_image(result, result.additional_images[0], 0))
-                    print(f"DEBUG: Added task for back image: {result.title[:30]}...")
-            
-            # Process immediate batch with a reasonable timeout
-            if immediate_tasks:
-                print(f"DEBUG: Running {len(immediate_tasks)} immediate image processing tasks")
-                try:
-                    await asyncio.gather(*immediate_tasks)
-                    print("DEBUG: Completed immediate image processing successfully")
-                except Exception as e:
-                    print(f"DEBUG: Error during immediate image processing: {str(e)}")
-        
-        # Schedule remaining processing as a background task
-        if background_tasks:
-            background_tasks.add_task(process_image_text, aggregated_results.copy(), request.query)
-            print("DEBUG: Added background task for processing remaining images")
+        logger.debug("Number of aggregated results after filtering: %d", len(aggregated_results))
+        
+        # Remember the results so the client can poll for text as it is extracted
+        search_id = uuid.uuid4().hex
+        _search_sessions.set(search_id, aggregated_results)
+        
+        # Extract image text in the background rather than delaying the response;
+        # the frontend shows a loading state and polls for the text. Queue
+        # workers take the work off this process when configured.
+        if await _enqueue_image_text(search_id, aggregated_results):
+            logger.debug("Queued images for text extraction")
         else:
-            # Process the remaining images in the background
-            asyncio.create_task(process_image_text(aggregated_results.copy(), request.query))
-            print("DEBUG: Created background task for processing remaining images")
+            background_tasks.add_task(process_image_text, aggregated_results.copy(), request.query)
+            logger.debug("Added background task for processing images")
         
         # Prepare response
         response = SearchResponse(
@@ -156,19 +144,40 @@ async def search_postcards(request: SearchRequest, background_tasks: BackgroundT
             page=request.page,
             limit=request.limit,
             enhanced_query=enhanced_query,
-            filters_applied=request.filters.dict() if request.filters else None
+            filters_applied=request.filters.model_dump(exclude_none=True) if request.filters else None,
+            search_id=search_id
         )
         
-        print(f"DEBUG: Successfully prepared response with {len(response.results)} results")
+        logger.debug("Successfully prepared response with %d results", len(response.results))
+        _search_response_cache.set(cache_key, response)
         return response
     except Exception as e:
-        print(f"ERROR: Exception in search_postcards: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Exception in search_postcards: %s", e)
         raise
 
+def _results_or_empty(results, source: str) -> List[SearchResult]:
+    """
+    Turn a gathered marketplace search outcome into a result list.
+    
+    Args:
+        results: Result list, or the exception the search raised
+        source: Marketplace name for logging
+        
+    Returns:
+        The results, or an empty list if the search failed
+    """
+    if isinstance(results, BaseException):
+        logger.warning("Error in %s search: %s", source, results)
+        return []
+    
+    logger.debug("Got %d results from %s", len(results), source)
+    return results
+
 @router.get("/search", response_model=SearchResponse)
 async def search_postcards_get(
+    background_tasks: BackgroundTasks,
+    http_request: Request,
+    response: Response,
     query: str = Query(..., description="Search query for postcards"),
     year_min: Optional[int] = Query(None, description="Minimum year"),
     year_max: Optional[int] = Query(None, description="Maximum year"),
@@ -177,11 +186,10 @@ async def search_postcards_get(
     price_max: Optional[float] = Query(None, description="Maximum price"),
     sort_by: Optional[str] = Query("relevance", description="Sort order"),
     page: int = Query(1, description="Page number"),
-    limit: int = Query(20, description="Results per page"),
-    background_tasks: BackgroundTasks = None
+    limit: int = Query(20, description="Results per page")
 ):
     try:
-        print(f"DEBUG: GET search request received for query: {query}")
+        logger.debug("GET search request received for query: %s", query)
         filters = SearchFilters(
             year_min=year_min,
             year_max=year_max,
@@ -198,13 +206,312 @@ async def search_postcards_get(
             limit=limit
         )
         
-        return await search_postcards(request, background_tasks)
+        search_response = await search_postcards(request, background_tasks)
+        
+        # Let browsers and CDNs reuse the response for as long as we would,
+        # and revalidate it by content so a fresh search with the same
+        # results still answers 304 without resending the body
+        content_hash = _content_hash(search_response)
+        cache_control = f"max-age={SEARCH_RESPONSE_CACHE_TTL}"
+        client_search_id = _matching_search_id(
+            http_request.headers.get("if-none-match"), content_hash, search_response.search_id
+        )
+        if client_search_id is not None:
+            # The client keeps its copy and polls with that copy's search_id,
+            # so point it at this search's session
+            _alias_search_session(client_search_id, search_response.search_id)
+            headers = {"ETag": _etag(content_hash, client_search_id), "Cache-Control": cache_control}
+            return Response(status_code=304, headers=headers)
+        
+        response.headers.update({
+            "ETag": _etag(content_hash, search_response.search_id),
+            "Cache-Control": cache_control,
+        })
+        return search_response
     except Exception as e:
-        print(f"ERROR: Exception in GET search endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Exception in GET search endpoint: %s", e)
         raise
 
+def _content_hash(search_response: SearchResponse) -> str:
+    """
+    Hash a search response's content, for its ETag.
+    
+    The search_id is left out, since every fresh search gets a new one even
+    when its results are unchanged.
+    
+    Args:
+        search_response: Response being sent
+        
+    Returns:
+        Hex digest of the response without its search_id
+    """
+    body = search_response.model_dump_json(exclude={"search_id"})
+    return hashlib.sha1(body.encode()).hexdigest()
+
+def _etag(content_hash: str, search_id: str) -> str:
+    """
+    Build a weak ETag from a response's content hash and the search_id the
+    client's copy carries.
+    
+    Args:
+        content_hash: Hash from _content_hash
+        search_id: search_id in the client's copy of the response
+        
+    Returns:
+        Quoted weak ETag
+    """
+    return f'W/"{content_hash}.{search_id}"'
+
+def _matching_search_id(if_none_match: Optional[str], content_hash: str, search_id: str) -> Optional[str]:
+    """
+    Check an If-None-Match header against the current content, using weak
+    comparison.
+    
+    Args:
+        if_none_match: If-None-Match header value, possibly a comma-separated list
+        content_hash: Hash of the current response content
+        search_id: search_id of the current response, used for "*"
+        
+    Returns:
+        The search_id of the client's matching copy, or None if the client's
+        copy is out of date
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return search_id
+    
+    for tag in if_none_match.split(","):
+        tag_hash, _, tag_search_id = tag.strip().removeprefix("W/").strip('"').partition(".")
+        if tag_hash == content_hash and tag_search_id:
+            return tag_search_id
+    return None
+
+def _alias_search_session(alias_id: str, search_id: str) -> None:
+    """
+    Make an older search_id serve a newer search's image text, and keep it
+    alive for another session TTL.
+    
+    Args:
+        alias_id: search_id the client still holds
+        search_id: search_id of the current search
+    """
+    if alias_id == search_id:
+        return
+    
+    results = _search_sessions.get(search_id)
+    if results is not None:
+        _search_sessions.set(alias_id, results)
+    queued_at = _queued_searches.get(search_id)
+    if queued_at is not None:
+        _queued_searches.set(alias_id, queued_at)
+    else:
+        _queued_searches.pop(alias_id)
+
+@router.post("/search/stream")
+async def stream_search_postcards(request: SearchRequest):
+    """
+    Search for postcards, streaming results as newline-delimited JSON.
+    
+    Each marketplace's results are sent as soon as it responds instead of
+    waiting for the slowest one, followed by image text as it is extracted.
+    Every line is one JSON object with a "type":
+    
+    - "result": {"id", "result"} for each search result
+    - "enhanced_query": {"enhanced_query"}
+    - "ocr": {"id", "index", "text"}; index is null for the main image,
+      otherwise the position in additional_images
+    - "done": {"total"} once everything has been sent
+    
+    Args:
+        request: Search request containing query and filters
+        
+    Returns:
+        Streaming application/x-ndjson response
+    """
+    return StreamingResponse(_stream_search(request), media_type="application/x-ndjson")
+
+async def _stream_search(request: SearchRequest) -> AsyncIterator[bytes]:
+    """
+    Generate the NDJSON frames for stream_search_postcards.
+    
+    Args:
+        request: Search request containing query and filters
+        
+    Yields:
+        One encoded JSON line per frame
+    """
+    sort_by = request.filters.sort_by if request.filters else "relevance"
+    searches = {
+        "eBay": search_ebay(request.query, request.filters, request.page, request.limit),
+        "Etsy": search_etsy(request.query, request.filters, request.page, request.limit),
+        "HipPostcard": search_hippostcard(request.query, request.filters, request.page, request.limit),
+    }
+    pending = {
+        asyncio.create_task(asyncio.wait_for(search, timeout=MARKETPLACE_SEARCH_TIMEOUT)): ("search", source)
+        for source, search in searches.items()
+    }
+    enhance_task = asyncio.create_task(
+        asyncio.wait_for(enhance_query(request.query), timeout=MARKETPLACE_SEARCH_TIMEOUT)
+    )
+    pending[enhance_task] = ("enhance", None)
+    
+    total = 0
+    images_queued = 0
+    deadline = time.monotonic() + IMAGE_PROCESSING_TIMEOUT
+    
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                kind, payload = pending.pop(task)
+                
+                if kind == "enhance":
+                    enhanced_query = None if task.exception() else task.result()
+                    yield _ndjson({"type": "enhanced_query", "enhanced_query": enhanced_query})
+                
+                elif kind == "search":
+                    results = _results_or_empty(task.exception() or task.result(), payload)
+                    results = aggregate_results([results], request.filters, sort_by=sort_by)
+                    jobs = []
+                    for result in results:
+                        result_id = total
+                        total += 1
+                        yield _ndjson({
+                            "type": "result",
+                            "id": result_id,
+                            "result": result.model_dump(exclude={"image_text", "additional_image_text"}),
+                        })
+                        
+                        # Same cap as process_image_text, across all sources
+                        if images_queued >= MAX_POSTCARDS_TO_PROCESS:
+                            continue
+                        images_queued += 1
+                        if result.image_url:
+                            jobs.append((result_id, result.image_url, None))
+                        for i, img_url in enumerate(result.additional_images or []):
+                            jobs.append((result_id, img_url, i))
+                    
+                    # Start extracting this source's image text while the
+                    # other marketplaces are still responding
+                    for i in range(0, len(jobs), MAX_IMAGES_PER_REQUEST):
+                        batch = jobs[i:i + MAX_IMAGES_PER_REQUEST]
+                        timeout = max(deadline - time.monotonic(), 0)
+                        batch_task = asyncio.create_task(asyncio.wait_for(
+                            _get_image_texts([image_url for _, image_url, _ in batch]), timeout=timeout
+                        ))
+                        pending[batch_task] = ("ocr", batch)
+                
+                elif kind == "ocr":
+                    if task.exception():
+                        logger.error("Failed to analyze batch of %d images: %s", len(payload), task.exception())
+                        image_texts = [None] * len(payload)
+                    else:
+                        image_texts = task.result()
+                    for (result_id, _, index), image_text in zip(payload, image_texts):
+                        yield _ndjson({"type": "ocr", "id": result_id, "index": index, "text": image_text or ""})
+        
+        yield _ndjson({"type": "done", "total": total})
+    finally:
+        # The client may disconnect mid-stream; don't leave work running
+        for task in pending:
+            task.cancel()
+
+def _ndjson(frame: Dict[str, Any]) -> bytes:
+    return orjson.dumps(frame) + b"\n"
+
+@router.get("/search/{search_id}/image-text")
+async def get_search_image_text(search_id: str):
+    """
+    Get the image text extracted so far for an earlier search.
+    
+    Args:
+        search_id: ID returned with the search response
+        
+    Returns:
+        Text and ocr_status for each result, in the same order as the search
+        results
+    """
+    results = _search_sessions.get(search_id)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Search not found or expired")
+    
+    queued_at = _queued_searches.get(search_id)
+    if queued_at is not None:
+        await _collect_queued_image_text(results, queued_at)
+    
+    return {
+        "search_id": search_id,
+        "results": [
+            {
+                "image_text": result.image_text,
+                "additional_image_text": result.additional_image_text,
+                "ocr_status": result.ocr_status,
+            }
+            for result in results
+        ]
+    }
+
+async def _enqueue_image_text(search_id: str, results: List[SearchResult]) -> bool:
+    """
+    Hand a search's images to the OCR queue workers, if a queue is configured.
+    
+    Args:
+        search_id: ID of the search
+        results: List of search results
+        
+    Returns:
+        True if the images were queued, False if they should be processed here
+    """
+    if not ocr_queue.is_enabled():
+        return False
+    
+    main_image_jobs, additional_image_jobs = _collect_image_jobs(results)
+    urls = list(dict.fromkeys(url for _, url, _ in main_image_jobs + additional_image_jobs if url))
+    if not await ocr_queue.enqueue(search_id, urls):
+        return False
+    
+    _queued_searches.set(search_id, time.monotonic())
+    return True
+
+async def _collect_queued_image_text(results: List[SearchResult], queued_at: float):
+    """
+    Fill in text the OCR queue workers have published for a search's images.
+    
+    Args:
+        results: List of search results
+        queued_at: When the images were queued (time.monotonic())
+    """
+    pending = [result for result in results if result.ocr_status == "pending"]
+    if not pending:
+        return
+    
+    main_image_jobs, additional_image_jobs = _collect_image_jobs(pending)
+    jobs = [
+        job for job in main_image_jobs + additional_image_jobs
+        if job[1] and (job[0].image_text if job[2] is None else _additional_text(job[0], job[2])) is None
+    ]
+    image_texts = await asyncio.gather(*(ocr_cache.get(image_url) for _, image_url, _ in jobs))
+    for (result, _, index), image_text in zip(jobs, image_texts):
+        if image_text is None:
+            continue
+        if index is None:
+            set_main_image_text(result, image_text)
+        else:
+            set_additional_image_text(result, index, image_text)
+        _update_ocr_status(result)
+    
+    # Workers only publish images that had text, so give up on the rest
+    # once processing would have timed out
+    if time.monotonic() - queued_at > IMAGE_PROCESSING_TIMEOUT:
+        for result in pending:
+            if result.ocr_status == "pending":
+                result.ocr_status = "none"
+
+def _additional_text(result: SearchResult, index: int) -> Optional[str]:
+    texts = result.additional_image_text or []
+    return texts[index] if index < len(texts) else None
+
 async def process_image_text(results: List[SearchResult], query: str):
     """
     Process images in search results to extract text.
@@ -221,186 +528,201 @@ async def process_image_text(results: List[SearchResult], query: str):
     if not results:
         return
     
-    # Create tasks for processing images
-    main_image_tasks = []
-    additional_image_tasks = []
-    
-    # Apply a reasonable limit to prevent endless processing
+    main_image_jobs, additional_image_jobs = _collect_image_jobs(results)
     results_to_process = results[:MAX_POSTCARDS_TO_PROCESS]
     
-    # Process each result up to the limit
-    for result in results_to_process:
-        # Process the main image if it hasn't been processed yet and isn't already being processed
-        if result.image_url and result.image_url not in processed_images:
-            processed_images.add(result.image_url)
-            main_image_tasks.append(analyze_main_image(result))
-            
-        # Process additional images if available
-        if result.additional_images:
-            for i, img_url in enumerate(result.additional_images):
-                # Skip if this additional image is being processed
-                if img_url in processed_images:
-                    continue
-                    
-                processed_images.add(img_url)
-                additional_image_tasks.append(analyze_additional_image(result, img_url, i))
-    
-    num_main_images = len(main_image_tasks)
-    num_additional_images = len(additional_image_tasks)
+    num_main_images = len(main_image_jobs)
+    num_additional_images = len(additional_image_jobs)
     total_images = num_main_images + num_additional_images
     
     if total_images == 0:
-        print("No new images to process")
+        logger.debug("No new images to process")
         return
         
-    print(f"Processing text for {total_images} total images ({num_main_images} main, {num_additional_images} additional) from {len(results_to_process)}/{len(results)} postcards")
-    
-    # First process main images (front of postcards)
-    if main_image_tasks:
-        print(f"Processing {num_main_images} main images (postcard fronts)")
-        # Process in batches to avoid overwhelming the API
-        batch_size = MAX_CONCURRENT_REQUESTS
-        for i in range(0, len(main_image_tasks), batch_size):
-            # Check if we've exceeded the timeout
-            if time.time() - start_time > IMAGE_PROCESSING_TIMEOUT:
-                print(f"Main image processing timed out after {IMAGE_PROCESSING_TIMEOUT} seconds. Processed {i} of {num_main_images} main images.")
-                return
-                
-            batch = main_image_tasks[i:i+batch_size]
-            batch_num = i//batch_size + 1
-            total_batches = (len(main_image_tasks) + batch_size - 1)//batch_size
-            
-            print(f"Processing main image batch {batch_num}/{total_batches}: {len(batch)} images")
-            
-            try:
-                await asyncio.wait_for(
-                    asyncio.gather(*batch), 
-                    timeout=30
-                )
-            except asyncio.TimeoutError:
-                print(f"Main image batch {batch_num} timed out. Moving to next batch.")
-                
-            # Small delay between batches to avoid rate limits
-            if i + batch_size < len(main_image_tasks):
-                await asyncio.sleep(0.5)
-    
-    # Then process additional images (back of postcards)
-    if additional_image_tasks:
-        print(f"Processing {num_additional_images} additional images (postcard backs)")
-        # Process in batches to avoid overwhelming the API
-        batch_size = MAX_CONCURRENT_REQUESTS
-        for i in range(0, len(additional_image_tasks), batch_size):
-            # Check if we've exceeded the timeout
-            if time.time() - start_time > IMAGE_PROCESSING_TIMEOUT:
-                print(f"Additional image processing timed out after {IMAGE_PROCESSING_TIMEOUT} seconds. Processed {i} of {num_additional_images} additional images.")
-                return
-                
-            batch = additional_image_tasks[i:i+batch_size]
-            batch_num = i//batch_size + 1
-            total_batches = (len(additional_image_tasks) + batch_size - 1)//batch_size
-            
-            print(f"Processing additional image batch {batch_num}/{total_batches}: {len(batch)} images")
-            
-            try:
-                await asyncio.wait_for(
-                    asyncio.gather(*batch), 
-                    timeout=30
-                )
-            except asyncio.TimeoutError:
-                print(f"Additional image batch {batch_num} timed out. Moving to next batch.")
-                
-            # Small delay between batches to avoid rate limits
-            if i + batch_size < len(additional_image_tasks):
-                await asyncio.sleep(0.5)
+    logger.info(
+        "Processing text for %d total images (%d main, %d additional) from %d/%d postcards",
+        total_images, num_main_images, num_additional_images, len(results_to_process), len(results)
+    )
+    
+    # Listings often share a photo, possibly at different CDN sizes - extract
+    # each distinct image once and apply its text to every job using it
+    image_groups: Dict[str, List[tuple]] = {}
+    for job in main_image_jobs + additional_image_jobs:
+        image_groups.setdefault(canonical_url(job[1]) if job[1] else "", []).append(job)
+    if len(image_groups) < total_images:
+        logger.debug("Deduplicated %d images to %d distinct images", total_images, len(image_groups))
     
-    print(f"Completed image text processing in {time.time() - start_time:.2f} seconds")
+    # Group images so each Vision request transcribes up to
+    # MAX_IMAGES_PER_REQUEST of them; each batch holds one api_semaphore
+    # slot. Fronts are queued first so they tend to be extracted before backs.
+    groups = list(image_groups.values())
+    batches = [groups[i:i + MAX_IMAGES_PER_REQUEST] for i in range(0, len(groups), MAX_IMAGES_PER_REQUEST)]
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(process_image_batch(batch) for batch in batches), return_exceptions=True),
+            timeout=IMAGE_PROCESSING_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Image processing timed out after %d seconds", IMAGE_PROCESSING_TIMEOUT)
+        for result in results_to_process:
+            if result.ocr_status == "pending":
+                result.ocr_status = "none"
+        return
+    
+    logger.info("Completed image text processing in %.2f seconds", time.time() - start_time)
 
-async def analyze_main_image(result: SearchResult):
+def _collect_image_jobs(results: List[SearchResult]) -> Tuple[List[tuple], List[tuple]]:
     """
-    Process the main image (front) of a search result to extract text.
+    List the images to extract text from, up to MAX_POSTCARDS_TO_PROCESS
+    postcards, marking results that won't get text.
     
     Args:
-        result: Search result with the main image to analyze
+        results: List of search results
+        
+    Returns:
+        Main and additional image jobs, as (result, image URL, additional
+        image index or None for the main image) tuples
     """
-    try:
-        print(f"DEBUG: Starting text extraction for main image: {result.title[:30]}...")
+    main_image_jobs = []
+    additional_image_jobs = []
+    
+    # Results past the limit won't get text
+    for result in results[MAX_POSTCARDS_TO_PROCESS:]:
+        result.ocr_status = "none"
+    
+    # Process each result up to the limit
+    for result in results[:MAX_POSTCARDS_TO_PROCESS]:
+        if not result.image_url and not result.additional_images:
+            result.ocr_status = "none"
+            continue
         
-        # Skip if no image URL is available
-        if not result.image_url:
-            print(f"DEBUG: No main image URL for: {result.title[:30]}")
-            result.image_text = ""  # Use empty string to indicate no text
-            return
-            
-        # Check if this image has already been processed - use the cache in analyze_image
-        async with api_semaphore:
-            print(f"DEBUG: Extracting text from main image: {result.title[:30]}...")
-            image_text = await analyze_image(result.image_url)
+        # Process the main image; already-extracted images are served from image_text_cache
+        if result.image_url:
+            main_image_jobs.append((result, result.image_url, None))
             
-        # Update the result with extracted text - always use empty string for None to avoid undefined
-        result.image_text = image_text if image_text is not None else ""
+        # Process additional images if available
+        if result.additional_images:
+            for i, img_url in enumerate(result.additional_images):
+                additional_image_jobs.append((result, img_url, i))
+    
+    return main_image_jobs, additional_image_jobs
+
+async def _get_image_texts(image_urls: List[str]) -> List[Optional[str]]:
+    """
+    Get the text in several images, checking the local and shared OCR caches
+    before running one (semaphore-limited) batch analysis for the misses.
+    
+    Args:
+        image_urls: URLs of the images
         
+    Returns:
+        Extracted text (or None if no text was found) for each image, in order
+    """
+    image_texts = [image_text_cache.get(url) if url else None for url in image_urls]
+    missing = [
+        i for i, url in enumerate(image_urls)
+        if url and image_texts[i] is None and url not in _no_text_urls
+    ]
+    if not missing:
+        return image_texts
+    
+    shared_texts = await asyncio.gather(*(ocr_cache.get(image_urls[i]) for i in missing))
+    for i, image_text in zip(missing, shared_texts):
         if image_text:
-            print(f"DEBUG: Successfully extracted text from main image of {result.title[:30]}: {image_text[:50]}...")
-        else:
-            print(f"DEBUG: No text extracted from main image of {result.title[:30]}")
+            image_texts[i] = image_text
+            image_text_cache.set(image_urls[i], image_text)
+    
+    to_analyze = [i for i in missing if image_texts[i] is None]
+    if to_analyze:
+        # Only actual analyses take a semaphore slot; cache hits don't wait.
+        # analyze_images_batch stores what it extracts in image_text_cache.
+        async with api_semaphore:
+            analyzed_texts = await analyze_images_batch([image_urls[i] for i in to_analyze])
+        for i, image_text in zip(to_analyze, analyzed_texts):
+            image_texts[i] = image_text
+            if image_text:
+                await ocr_cache.put(image_urls[i], image_text)
+            else:
+                _no_text_urls.set(image_urls[i], True)
+    
+    return image_texts
+
+async def process_image_batch(groups: List[List[tuple]]):
+    """
+    Extract text for a batch of images and store it on their search results.
+    
+    Args:
+        groups: Jobs for each distinct image, as (result, image URL, additional
+            image index or None for the main image) tuples
+    """
+    try:
+        image_texts = await _get_image_texts([jobs[0][1] for jobs in groups])
     except Exception as e:
-        print(f"ERROR: Failed to analyze main image for {result.title[:30]}: {str(e)}")
-        # Set to empty string to indicate extraction failed
-        result.image_text = ""
+        logger.error("Failed to analyze batch of %d images: %s", len(groups), e)
+        image_texts = [None] * len(groups)
+    
+    for jobs, image_text in zip(groups, image_texts):
+        for result, _, index in jobs:
+            if index is None:
+                set_main_image_text(result, image_text)
+            else:
+                set_additional_image_text(result, index, image_text)
+            _update_ocr_status(result)
+
+def _update_ocr_status(result: SearchResult):
+    """
+    Mark a search result done once text has been stored for all of its images.
+    
+    Args:
+        result: Search result to update
+    """
+    if result.image_url and result.image_text is None:
+        return
+    additional_texts = result.additional_image_text or []
+    if len(additional_texts) < len(result.additional_images or []) or None in additional_texts:
+        return
+    result.ocr_status = "done"
 
-async def analyze_additional_image(result: SearchResult, image_url: str, index: int):
+def set_main_image_text(result: SearchResult, image_text: Optional[str]):
     """
-    Process an additional image (e.g., back of postcard) to extract text.
+    Store the text extracted from the main image (front) of a search result.
+    
+    Args:
+        result: Search result to update
+        image_text: Extracted text, or None if no text was found
+    """
+    # Always use empty string for None to avoid undefined
+    result.image_text = image_text if image_text is not None else ""
+    
+    if image_text:
+        logger.debug("Successfully extracted text from main image of %.30s: %.50s...", result.title, image_text)
+    else:
+        logger.debug("No text extracted from main image of %.30s", result.title)
+
+def set_additional_image_text(result: SearchResult, index: int, image_text: Optional[str]):
+    """
+    Store the text extracted from an additional image (e.g., back of postcard).
     
     Args:
         result: Search result to update
-        image_url: URL of the additional image
         index: Index of the additional image
+        image_text: Extracted text, or None if no text was found
     """
-    try:
-        print(f"DEBUG: Starting text extraction for additional image {index+1}: {result.title[:30]}...")
-        
-        # Skip if no image URL is available
-        if not image_url:
-            print(f"DEBUG: No URL for additional image {index+1} of: {result.title[:30]}")
-            # Initialize the additional_image_text attribute if it doesn't exist
-            if not hasattr(result, 'additional_image_text'):
-                result.additional_image_text = []
-            # Extend the list if needed
-            while len(result.additional_image_text) <= index:
-                result.additional_image_text.append("")
-            return
-        
-        # Initialize additional_image_text if it doesn't exist
-        if not hasattr(result, 'additional_image_text'):
-            result.additional_image_text = []
-        
-        # Extend the list if needed to fit this index
-        while len(result.additional_image_text) <= index:
-            result.additional_image_text.append(None)
-            
-        # Extract text from the image
-        async with api_semaphore:
-            print(f"DEBUG: Extracting text from additional image {index+1}: {result.title[:30]}...")
-            image_text = await analyze_image(image_url)
-            
-        # Update with extracted text (use empty string if None to avoid undefined)
-        result.additional_image_text[index] = image_text if image_text is not None else ""
+    # Initialize additional_image_text if it doesn't exist
+    if result.additional_image_text is None:
+        result.additional_image_text = []
+    
+    # Extend the list if needed to fit this index; None marks images still pending
+    while len(result.additional_image_text) <= index:
+        result.additional_image_text.append(None)
         
-        if image_text:
-            print(f"DEBUG: Successfully extracted text from additional image {index+1} of {result.title[:30]}: {image_text[:50]}...")
-        else:
-            print(f"DEBUG: No text extracted from additional image {index+1} of {result.title[:30]}")
-    except Exception as e:
-        print(f"ERROR: Failed to analyze additional image {index+1} for {result.title[:30]}: {str(e)}")
-        # Ensure the additional_image_text is initialized
-        if not hasattr(result, 'additional_image_text'):
-            result.additional_image_text = []
-        # Extend the list if needed and set empty string for error case
-        while len(result.additional_image_text) <= index:
-            result.additional_image_text.append("")
-        # Update with empty string to indicate error
-        result.additional_image_text[index] = ""
+    # Update with extracted text (use empty string if None to avoid undefined)
+    result.additional_image_text[index] = image_text if image_text is not None else ""
+    
+    if image_text:
+        logger.debug("Successfully extracted text from additional image %d of %.30s: %.50s...", index + 1, result.title, image_text)
+    else:
+        logger.debug("No text extracted from additional image %d of %.30s", index + 1, result.title)
 
 @router.get("/test-extraction", response_model=dict)
 async def test_extraction():
@@ -408,14 +730,13 @@ async def test_extraction():
     try:
         # Test main image
         test_image = "https://i.ebayimg.com/images/g/YdEAAOSwlSxlsrq4/s-l1600.jpg"
-        print(f"Testing text extraction from: {test_image}")
+        logger.info("Testing text extraction from: %s", test_image)
         
         # Extract text manually
-        image_data = await download_image(test_image)
-        if not image_data:
+        try:
+            text = await download_and_extract_text(test_image)
+        except ImageDownloadError:
             return {"error": "Failed to download test image"}
-            
-        text = await extract_text_from_image(image_data)
         
         # Return both the raw extracted text and a cleaned version
         return {
@@ -425,9 +746,7 @@ async def test_extraction():
             "text_length": len(text) if text else 0,
         }
     except Exception as e:
-        print(f"Error in test extraction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in test extraction: %s", e)
         return {"error": str(e)}
 
 @router.post("/test-custom-extraction")
@@ -438,14 +757,13 @@ async def test_custom_extraction(request: dict):
         if not image_url:
             return {"error": "No image URL provided"}
             
-        print(f"Testing custom text extraction from: {image_url}")
+        logger.info("Testing custom text extraction from: %s", image_url)
         
         # Extract text manually
-        image_data = await download_image(image_url)
-        if not image_data:
+        try:
+            text = await download_and_extract_text(image_url)
+        except ImageDownloadError:
             return {"error": "Failed to download provided image"}
-            
-        text = await extract_text_from_image(image_data)
         
         # Return both the raw extracted text and a cleaned version
         return {
@@ -455,7 +773,5 @@ async def test_custom_extraction(request: dict):
             "text_length": len(text) if text else 0,
         }
     except Exception as e:
-        print(f"Error in custom test extraction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in custom test extraction: %s", e)
         return {"error": str(e)} 
\ No newline at end of file
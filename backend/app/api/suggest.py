@@ -1,33 +1,29 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import List, Optional, TypedDict
 
 from app.services.gpt_service import generate_suggestions
 
 router = APIRouter()
 
-class SuggestionResponse(BaseModel):
+class SuggestionResponse(TypedDict):
     suggestions: List[str]
     original_query: str
 
-@router.get("/suggest", response_model=SuggestionResponse)
+# The payload is a plain dict, so skip response model validation on this hot path
+@router.get("/suggest", response_model=None)
 async def get_suggestions(
     query: str = Query(..., description="Partial search query to get suggestions for"),
     limit: int = Query(5, description="Number of suggestions to return")
-):
+) -> SuggestionResponse:
     try:
-        if not query or len(query.strip()) < 2:
-            return SuggestionResponse(
-                suggestions=[],
-                original_query=query
-            )
+        # Normalize once; the raw input is still echoed back as original_query
+        q = query.strip() if query else ""
+        if len(q) < 2:
+            return {"suggestions": [], "original_query": query}
         
-        suggestions = await generate_suggestions(query, limit)
-        
-        return SuggestionResponse(
-            suggestions=suggestions,
-            original_query=query
-        )
+        # generate_suggestions caches GPT answers (but not fallbacks) by prefix
+        suggestions = await generate_suggestions(q, limit)
+        return {"suggestions": suggestions, "original_query": query}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate suggestions: {str(e)}") 
\ No newline at end of file
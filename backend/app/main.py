@@ -1,40 +1,69 @@
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from mangum import Mangum
+import asyncio
 import os
 
+# uvloop is a faster drop-in event loop; install it for Lambda/Mangum too,
+# where uvicorn isn't the one choosing the loop
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 from app.api import search, suggest
+from app.services.http_client import get_http_client, close_http_client
+from app.services.ebay_service import refresh_ebay_token_periodically
+from app.services import ocr_cache, ocr_queue
+from app.utils.ocr import shutdown_ocr_pool
+from app.utils.logging_config import configure_logging
+
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    # Shared HTTP client for all outbound marketplace requests
+    app.state.http = get_http_client()
+    ocr_queue.check_config()
+    # Keep the eBay OAuth token warm so searches never refresh it inline
+    token_refresher = asyncio.create_task(refresh_ebay_token_periodically())
+    yield
+    token_refresher.cancel()
+    with suppress(asyncio.CancelledError):
+        await token_refresher
+    await close_http_client()
+    await ocr_cache.close()
+    await ocr_queue.close()
+    shutdown_ocr_pool()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Postcard Search API",
     description="API for searching postcards across multiple marketplaces with AI-enhanced queries",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson serializes responses faster than stdlib json
 )
 
-# Configure CORS
-origins = [
-    "http://localhost:3000",  # Local Next.js development server
-    "http://localhost:3001",  # Alternative port
-    "http://localhost:3002",  # Alternative port
-    "http://localhost:3003",  # Alternative port
-    "http://localhost:3004",  # Alternative port
-    "http://localhost:3005",  # Alternative port
-    "http://localhost:3020",  # Frontend port from restart script
-    "http://localhost:3021",  # New frontend port
-    "http://localhost:8080",  # Backend port
-    "http://localhost:9000",  # Backend port
-    "http://localhost:9001",  # Backend port from restart script
-    "https://postcard-search.netlify.app",  # Production frontend URL (update this)
-    "*",  # For development - remove in production
-]
+# Configure CORS. Credentials can't be combined with a "*" origin, so allowed
+# origins are matched by regex: local dev servers on any port, and the
+# production frontend.
+CORS_ORIGIN_REGEX = (
+    os.getenv("CORS_ORIGIN_REGEX")
+    or r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$|^https://postcard-search\.netlify\.app$"
+)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
+    allow_origin_regex=CORS_ORIGIN_REGEX,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,  # let browsers cache preflight responses for a day
 )
 
 # Include routers
@@ -59,4 +88,6 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 9002))
     print(f"Starting server on port {port}")
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True) 
\ No newline at end of file
+    # "auto" picks uvloop and httptools when installed, falling back to
+    # asyncio and h11 where they aren't available (e.g. Windows)
+    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True, loop="auto", http="auto") 
\ No newline at end of file
@@ -25,10 +25,12 @@ class SearchResult(BaseModel):
     link: str
     description: Optional[str] = None
     date: Optional[str] = None
+    year: Optional[int] = None  # Numeric year parsed from date, for filtering and sorting
     location: Optional[str] = None
     affiliate_link: Optional[str] = None
     image_text: Optional[str] = None  # Stores text extracted from the primary image
-    additional_image_text: Optional[List[str]] = None  # Text from additional images
+    additional_image_text: Optional[List[Optional[str]]] = None  # Text from additional images, None while pending
+    ocr_status: str = "pending"  # pending until text extraction finishes, then done; none if it won't run
 
 class SearchResponse(BaseModel):
     results: List[SearchResult]
@@ -36,4 +38,5 @@ class SearchResponse(BaseModel):
     page: int
     limit: int
     enhanced_query: Optional[str] = None
-    filters_applied: Optional[Dict[str, Any]] = None 
\ No newline at end of file
+    filters_applied: Optional[Dict[str, Any]] = None
+    search_id: Optional[str] = None  # Poll /search/{search_id}/image-text for extracted text 
\ No newline at end of file
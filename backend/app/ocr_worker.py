@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict
+
+from app.services import ocr_cache, ocr_queue
+from app.services.http_client import close_http_client
+from app.services.image_analysis_service import analyze_images_batch
+from app.utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Queue messages processed at once by this worker; each message is one
+# batched Vision request
+OCR_WORKER_CONCURRENCY = int(os.getenv("OCR_WORKER_CONCURRENCY", "5"))
+
+async def process_job(job: Dict[str, Any], semaphore: asyncio.Semaphore) -> None:
+    """
+    Extract text for one queued message and publish it to the shared OCR cache.
+
+    Args:
+        job: Message from ocr_queue.receive
+        semaphore: Limits concurrent analyses in this worker
+    """
+    urls = job.get("urls") or []
+    async with semaphore:
+        texts = await analyze_images_batch(urls)
+
+    for url, text in zip(urls, texts):
+        if text:
+            await ocr_cache.put(url, text)
+    await ocr_queue.delete(job["receipt_handle"])
+    logger.info("Extracted text for %d/%d images of search %s", sum(map(bool, texts)), len(urls), job.get("search_id"))
+
+async def run_worker() -> None:
+    """
+    Consume OCR jobs from the queue until cancelled.
+
+    Messages that fail are left on the queue, so SQS redelivers them after
+    the visibility timeout.
+    """
+    if not ocr_queue.is_enabled():
+        raise RuntimeError("OCR_QUEUE_URL and REDIS_URL must be set, with aiobotocore and redis installed")
+
+    semaphore = asyncio.Semaphore(OCR_WORKER_CONCURRENCY)
+    in_flight = set()
+    try:
+        while True:
+            # Don't pull more messages than we can start on right away
+            while len(in_flight) >= OCR_WORKER_CONCURRENCY:
+                _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+            try:
+                jobs = await ocr_queue.receive(max_messages=min(OCR_WORKER_CONCURRENCY - len(in_flight), 10))
+            except Exception as e:
+                logger.warning("OCR queue receive failed: %s", e)
+                await asyncio.sleep(5)
+                continue
+
+            for job in jobs:
+                task = asyncio.create_task(process_job(job, semaphore))
+                task.add_done_callback(_log_failure)
+                in_flight.add(task)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await ocr_queue.close()
+        await ocr_cache.close()
+        await close_http_client()
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("OCR job failed: %s", task.exception())
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(run_worker())
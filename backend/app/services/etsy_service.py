@@ -1,8 +1,16 @@
 import os
-import httpx
+import re
+import asyncio
+import logging
+import orjson
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from app.models.search_models import SearchResult, SearchFilters
+from app.services.http_client import request_with_retry
+from app.utils.cache import TTLCache
+
+# Set up logging
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +25,39 @@ ETSY_SEARCH_URL = "https://openapi.etsy.com/v3/application/listings/active"
 # Etsy category for postcards
 POSTCARD_CATEGORY = "paper_goods,postcards"
 
+# Descriptions longer than this are truncated with an ellipsis
+MAX_DESCRIPTION_LENGTH = 200
+
+# Shared default for missing nested objects in API responses
+_EMPTY: Dict[str, Any] = {}
+
+# Matches a four-digit year between 1800 and 2099
+_YEAR_RE = re.compile(r'(?:18|19|20)\d{2}')
+
+# Bound concurrent search requests to Etsy so bursts (prefetch plus live
+# searches) degrade gracefully instead of triggering 429s
+MAX_CONCURRENT_SEARCHES = 8
+_ETSY_SEM = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+# SearchFilters.sort_by -> Etsy (sort_on, sort_order); anything else uses Etsy's default
+_ETSY_SORT = {
+    "price_asc": ("price", "asc"),
+    "price_desc": ("price", "desc"),
+    "newest": ("created", "desc"),
+}
+
+# Prefetched pages keyed by (query, filters, page, limit)
+PAGE_CACHE_TTL = 300  # seconds
+_PAGE_CACHE = TTLCache(maxsize=256, ttl=PAGE_CACHE_TTL)
+_prefetching = {}  # page cache key -> in-flight prefetch task
+
+# Templates for mock results, used when USE_MOCK_DATA is enabled
+_MOCK_ETSY_TITLE = "Vintage {query} Postcard {year}"
+_MOCK_ETSY_IMAGE = "https://placehold.co/300x200/e65c00/white?text=Etsy+{query}+{n}"
+_MOCK_ETSY_LINK = "https://www.etsy.com/listing/mock{n}"
+_MOCK_ETSY_DESCRIPTION = "Beautiful vintage postcard featuring {query}. From circa {year}."
+_MOCK_ETSY_LOCATIONS = ("Paris", "New York", "London", "Tokyo", "Rome")
+
 # Use mock data for development
 USE_MOCK_DATA = False  # Set to False for production
 
@@ -24,6 +65,102 @@ async def search_etsy(query: str, filters: Optional[SearchFilters] = None, page:
     """
     Search for postcards on Etsy.
     
+    Pages are served from the prefetch cache when available, and the next
+    page is prefetched in the background so "next page" clicks return
+    without waiting on the Etsy API.
+    
+    Args:
+        query: The search query
+        filters: Optional search filters
+        page: Page number for pagination
+        limit: Number of results per page
+        
+    Returns:
+        List of SearchResult objects
+    """
+    key = _page_cache_key(query, filters, page, limit)
+    cached = _PAGE_CACHE.get(key)
+    if cached is None and key in _prefetching:
+        # The page is already being prefetched - wait for it instead of refetching
+        await asyncio.shield(_prefetching[key])
+        cached = _PAGE_CACHE.get(key)
+    
+    if cached is not None:
+        # Copy so per-request updates (e.g. image text) don't leak into the cache
+        results = [result.model_copy() for result in cached]
+    else:
+        results = await _fetch_etsy_page(query, filters, page, limit)
+    
+    if results:
+        _schedule_prefetch(query, filters, page + 1, limit)
+    
+    return results
+
+def _page_cache_key(query: str, filters: Optional[SearchFilters], page: int, limit: int) -> tuple:
+    """Build the prefetch cache key for a page of results."""
+    return (query, filters.model_dump_json() if filters else None, page, limit)
+
+def _schedule_prefetch(query: str, filters: Optional[SearchFilters], page: int, limit: int) -> None:
+    """Start fetching a page in the background unless it is cached or already in flight."""
+    key = _page_cache_key(query, filters, page, limit)
+    if key in _PAGE_CACHE or key in _prefetching:
+        return
+    
+    _prefetching[key] = asyncio.create_task(_prefetch_page(key, query, filters, page, limit))
+
+async def _prefetch_page(key: tuple, query: str, filters: Optional[SearchFilters], page: int, limit: int) -> None:
+    """Fetch a page of results and store it in the prefetch cache."""
+    try:
+        results = await _fetch_etsy_page(query, filters, page, limit)
+        if results:
+            _PAGE_CACHE.set(key, results)
+    except Exception as e:
+        logger.debug("Etsy prefetch of page %d failed: %s", page, e)
+    finally:
+        _prefetching.pop(key, None)
+
+def _build_etsy_params(query: str, filters: Optional[SearchFilters], limit: int, offset: int) -> Dict[str, Any]:
+    """
+    Build Etsy listings API query parameters from a query and filters.
+    
+    Args:
+        query: Search query
+        filters: Optional filters to apply
+        limit: Page size used for pagination
+        offset: Offset of the first result
+        
+    Returns:
+        Query parameters for the search request
+    """
+    params = {
+        "api_key": ETSY_API_KEY,
+        "keywords": query,
+        "taxonomy_id": POSTCARD_CATEGORY,
+        "limit": limit,
+        "offset": offset,
+        "includes": "Images,Shop"
+    }
+    
+    if not filters:
+        return params
+    
+    price_min = filters.price_min
+    price_max = filters.price_max
+    if price_min is not None:
+        params["min_price"] = price_min
+    if price_max is not None:
+        params["max_price"] = price_max
+    
+    sort = _ETSY_SORT.get(filters.sort_by)
+    if sort:
+        params["sort_on"], params["sort_order"] = sort
+    
+    return params
+
+async def _fetch_etsy_page(query: str, filters: Optional[SearchFilters] = None, page: int = 1, limit: int = 20) -> List[SearchResult]:
+    """
+    Fetch one page of postcard results from the Etsy API.
+    
     Args:
         query: The search query
         filters: Optional search filters
@@ -39,103 +176,75 @@ async def search_etsy(query: str, filters: Optional[SearchFilters] = None, page:
             return get_mock_etsy_results(query, limit)
             
         if not ETSY_API_KEY:
-            print("No Etsy API key found, falling back to empty results")
+            logger.warning("No Etsy API key found, falling back to empty results")
             return []
         
         # Calculate offset for pagination
         offset = (page - 1) * limit
         
         # Prepare query parameters
-        params = {
-            "api_key": ETSY_API_KEY,
-            "keywords": query,
-            "taxonomy_id": POSTCARD_CATEGORY,
-            "limit": limit,
-            "offset": offset,
-            "includes": "Images,Shop"
-        }
+        params = _build_etsy_params(query, filters, limit, offset)
         
-        # Add price filters if provided
-        if filters:
-            if filters.price_min is not None:
-                params["min_price"] = filters.price_min
-            if filters.price_max is not None:
-                params["max_price"] = filters.price_max
-            
-            # Add sort order
-            if filters.sort_by == "price_asc":
-                params["sort_on"] = "price"
-                params["sort_order"] = "asc"
-            elif filters.sort_by == "price_desc":
-                params["sort_on"] = "price"
-                params["sort_order"] = "desc"
-            elif filters.sort_by == "newest":
-                params["sort_on"] = "created"
-                params["sort_order"] = "desc"
+        # Make API request using the shared pooled client
+        response = await request_with_retry(
+            "GET", ETSY_SEARCH_URL, semaphore=_ETSY_SEM, params=params
+        )
         
-        # Make API request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(ETSY_SEARCH_URL, params=params)
-            
-            if response.status_code != 200:
-                print(f"Etsy search failed: {response.text}")
-                return []
-            
-            data = response.json()
-            listings = data.get("results", [])
-            
-            # Convert to SearchResult objects
-            results = []
-            for listing in listings:
-                # Extract price
-                price = float(listing.get("price", {}).get("amount", 0)) / 100  # Etsy prices are in cents
-                currency = listing.get("price", {}).get("currency_code", "USD")
-                
-                # Get the first image URL
-                image_url = ""
-                if "images" in listing and listing["images"]:
-                    image_url = listing["images"][0].get("url_570xN", "")
-                
-                # Create affiliate link if affiliate ID is available
-                link = f"https://www.etsy.com/listing/{listing.get('listing_id')}"
-                affiliate_link = None
-                if ETSY_AFFILIATE_ID and link:
-                    affiliate_link = f"{link}?utm_source=affiliate&utm_medium=api&utm_campaign={ETSY_AFFILIATE_ID}"
-                
-                # Extract date and location from title/description if available
-                date = None
-                location = None
-                title = listing.get("title", "")
-                description = listing.get("description", "")
-                
-                # Simple extraction - in a real app, use more sophisticated NLP
-                import re
-                year_match = re.search(r'(18|19|20)\d{2}', title + " " + description[:100])
-                if year_match:
-                    date = year_match.group(0)
-                
-                # Create SearchResult
-                result = SearchResult(
-                    source="Etsy",
-                    title=title,
-                    image_url=image_url,
-                    price=price,
-                    currency=currency,
-                    link=link,
-                    description=description[:200] + "..." if len(description) > 200 else description,
-                    date=date,
-                    location=location,
-                    affiliate_link=affiliate_link
-                )
-                
-                results.append(result)
-            
-            return results
+        if response.status_code != 200:
+            logger.warning("Etsy search failed: %s - %s", response.status_code, response.text)
+            return []
+        
+        data = orjson.loads(response.content)
+        listings = data.get("results", [])
+        
+        # Convert to SearchResult objects
+        results = [_etsy_listing_to_result(listing) for listing in listings]
+        
+        return results
     
     except Exception as e:
-        print(f"Etsy search error: {str(e)}")
+        logger.warning("Etsy search error: %s", e)
         return []
 
+def _etsy_listing_to_result(listing: Dict[str, Any]) -> SearchResult:
+    """
+    Convert an Etsy listing into a SearchResult.
+    
+    Args:
+        listing: Etsy listing data
+        
+    Returns:
+        SearchResult for the listing
+    """
+    get = listing.get
+    price_info = get("price") or _EMPTY
+    images = get("images")
+    title = get("title", "")
+    description = get("description", "")
+    link = f"https://www.etsy.com/listing/{get('listing_id')}"
+    
+    # Extract date from title/description if available
+    # Simple extraction - in a real app, use more sophisticated NLP
+    year_match = _YEAR_RE.search(title)
+    if year_match is None and description:
+        year_match = _YEAR_RE.search(description, 0, 100)
+    
+    return SearchResult(
+        source="Etsy",
+        title=title,
+        # Use the first image URL
+        image_url=images[0].get("url_570xN", "") if images else "",
+        price=float(price_info.get("amount", 0)) / 100,  # Etsy prices are in cents
+        currency=price_info.get("currency_code", "USD"),
+        link=link,
+        description=description if len(description) <= MAX_DESCRIPTION_LENGTH else description[:MAX_DESCRIPTION_LENGTH] + "…",
+        date=year_match.group(0) if year_match else None,
+        year=int(year_match.group(0)) if year_match else None,
+        location=None,
+        # Create affiliate link if affiliate ID is available
+        affiliate_link=f"{link}?utm_source=affiliate&utm_medium=api&utm_campaign={ETSY_AFFILIATE_ID}" if ETSY_AFFILIATE_ID else None
+    )
+
 def get_mock_etsy_results(query: str, count: int = 5) -> List[SearchResult]:
     """
     Generate mock search results for Etsy.
@@ -147,25 +256,21 @@ def get_mock_etsy_results(query: str, count: int = 5) -> List[SearchResult]:
     Returns:
         List of mock SearchResult objects
     """
-    results = []
-    
-    for i in range(count):
-        # Generate a random price between $5 and $30
-        price = 5.0 + (i * 3.5)
-        
-        result = SearchResult(
+    # Mock fields are built here with the right types, so skip validation
+    return [
+        SearchResult.model_construct(
             source="Etsy",
-            title=f"Vintage {query} Postcard {1920 + (i * 10)}",
-            image_url=f"https://placehold.co/300x200/e65c00/white?text=Etsy+{query}+{i+1}",
-            price=price,
+            title=_MOCK_ETSY_TITLE.format(query=query, year=1920 + i * 10),
+            image_url=_MOCK_ETSY_IMAGE.format(query=query, n=i + 1),
+            # Prices step from $5 upwards
+            price=5.0 + (i * 3.5),
             currency="USD",
-            link=f"https://www.etsy.com/listing/mock{i}",
-            description=f"Beautiful vintage postcard featuring {query}. From circa {1920 + (i * 10)}.",
-            date=f"{1920 + (i * 10)}",
-            location=["Paris", "New York", "London", "Tokyo", "Rome"][i % 5],
-            affiliate_link=f"https://www.etsy.com/listing/mock{i}"
+            link=_MOCK_ETSY_LINK.format(n=i),
+            description=_MOCK_ETSY_DESCRIPTION.format(query=query, year=1920 + i * 10),
+            date=str(1920 + i * 10),
+            year=1920 + i * 10,
+            location=_MOCK_ETSY_LOCATIONS[i % len(_MOCK_ETSY_LOCATIONS)],
+            affiliate_link=_MOCK_ETSY_LINK.format(n=i)
         )
-        
-        results.append(result)
-    
-    return results 
\ No newline at end of file
+        for i in range(count)
+    ] 
\ No newline at end of file
@@ -1,16 +1,54 @@
 import os
-from openai import OpenAI
+import re
+from openai import AsyncOpenAI
 from typing import List, Optional
 from dotenv import load_dotenv
 
+from app.utils.cache import SingleFlight, TTLCache
+
 # Load environment variables
 load_dotenv()
 
 # Configure OpenAI API with client-based approach
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+# Async client so GPT calls don't block the event loop, and concurrent calls
+# share its pooled connections
+client = AsyncOpenAI(api_key=api_key, max_retries=2, timeout=30.0)
 print(f"OpenAI API key available: {bool(api_key)}")
 
+# Queries that already read as postcard searches gain little from GPT
+# enhancement, so they skip the round trip
+_POSTCARD_RE = re.compile(r"\b(postcards?|rppc|real\s+photo)\b", re.I)
+MIN_WORDS_TO_SKIP_ENHANCEMENT = 4
+
+# Single-word place names that are already specific enough to search for
+KNOWN_PLACES = frozenset({
+    "alaska", "amsterdam", "atlanta", "berlin", "boston", "california",
+    "chicago", "colorado", "denver", "dublin", "england", "florida",
+    "france", "germany", "hawaii", "italy", "japan", "london", "madrid",
+    "miami", "paris", "philadelphia", "rome", "scotland", "seattle",
+    "spain", "texas", "tokyo", "venice", "vienna", "washington",
+})
+
+# GPT answers keyed by normalized query - popular searches repeat constantly,
+# so repeats skip the GPT round trip. Failures fall back to the original
+# query and aren't cached.
+GPT_CACHE_SIZE = 10_000
+GPT_CACHE_TTL = 7 * 24 * 3600  # seconds
+_enhanced_query_cache = TTLCache(maxsize=GPT_CACHE_SIZE, ttl=GPT_CACHE_TTL)
+_translation_cache = TTLCache(maxsize=GPT_CACHE_SIZE, ttl=GPT_CACHE_TTL)
+
+# Recent suggestions keyed by (normalized query, limit) - autocomplete
+# traffic is dominated by a small set of hot prefixes. As above, fallback
+# suggestions after a GPT failure aren't cached.
+SUGGESTION_CACHE_TTL = 600  # seconds
+_suggestion_cache = TTLCache(maxsize=GPT_CACHE_SIZE, ttl=SUGGESTION_CACHE_TTL)
+
+# Concurrent identical queries share a single GPT call
+_inflight_enhancements = SingleFlight()
+_inflight_translations = SingleFlight()
+_inflight_suggestions = SingleFlight()
+
 async def enhance_query(query: str) -> str:
     """
     Enhance a search query using GPT-4 to improve search results.
@@ -26,8 +64,42 @@ async def enhance_query(query: str) -> str:
         print(f"Skipping enhancement for short query: '{query}' or missing API key")
         return query
     
+    key = query.strip().lower()
+    if _needs_no_enhancement(key):
+        return query
+    enhanced_query = _enhanced_query_cache.get(key)
+    if enhanced_query is None:
+        enhanced_query = await _inflight_enhancements.run(key, lambda: _enhance_query(query))
+    return enhanced_query or query
+
+def _needs_no_enhancement(query: str) -> bool:
+    """
+    Check whether a normalized query is already specific enough to search as is.
+    
+    Args:
+        query: Stripped, lowercased search query
+        
+    Returns:
+        True if GPT enhancement can be skipped
+    """
+    return (
+        len(query.split()) >= MIN_WORDS_TO_SKIP_ENHANCEMENT
+        or query in KNOWN_PLACES
+        or _POSTCARD_RE.search(query) is not None
+    )
+
+async def _enhance_query(query: str) -> Optional[str]:
+    """
+    Ask GPT to enhance a query, caching the answer.
+    
+    Args:
+        query: The original search query from the user
+        
+    Returns:
+        The enhanced query, or None if enhancement failed
+    """
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": """
@@ -42,10 +114,11 @@ async def enhance_query(query: str) -> str:
         )
         enhanced_query = response.choices[0].message.content.strip()
         print(f"Enhanced query: '{query}' -> '{enhanced_query}'")
+        _enhanced_query_cache.set(query.strip().lower(), enhanced_query)
         return enhanced_query
     except Exception as e:
         print(f"Query enhancement failed: {str(e)}")
-        return query
+        return None
 
 async def generate_suggestions(query: str, limit: int = 5) -> List[str]:
     """
@@ -71,8 +144,36 @@ async def generate_suggestions(query: str, limit: int = 5) -> List[str]:
         ]
         return basic_suggestions[:limit]
     
+    key = (query.strip().lower(), limit)
+    suggestions = _suggestion_cache.get(key)
+    if suggestions is None:
+        suggestions = await _inflight_suggestions.run(key, lambda: _generate_suggestions(query, limit))
+    if suggestions is not None:
+        return suggestions
+    
+    # Fallback to basic suggestions
+    basic_suggestions = [
+        f"{query} vintage",
+        f"{query} historic",
+        f"{query} antique",
+        f"{query} collection",
+        f"{query} rare"
+    ]
+    return basic_suggestions[:limit]
+
+async def _generate_suggestions(query: str, limit: int) -> Optional[List[str]]:
+    """
+    Ask GPT for search suggestions, caching the answer.
+    
+    Args:
+        query: The partial query from the user
+        limit: Maximum number of suggestions to return
+        
+    Returns:
+        A list of search suggestions, or None if generation failed
+    """
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": """
@@ -88,19 +189,12 @@ async def generate_suggestions(query: str, limit: int = 5) -> List[str]:
         )
         
         suggestion_text = response.choices[0].message.content.strip()
-        suggestions = [s.strip() for s in suggestion_text.split('\n') if s.strip()]
-        return suggestions[:limit]
+        suggestions = [s.strip() for s in suggestion_text.split('\n') if s.strip()][:limit]
+        _suggestion_cache.set((query.strip().lower(), limit), suggestions)
+        return suggestions
     except Exception as e:
         print(f"Suggestion generation failed: {str(e)}")
-        # Fallback to basic suggestions
-        basic_suggestions = [
-            f"{query} vintage",
-            f"{query} historic",
-            f"{query} antique",
-            f"{query} collection",
-            f"{query} rare"
-        ]
-        return basic_suggestions[:limit]
+        return None
 
 async def detect_language_and_translate(query: str) -> tuple[str, str]:
     """
@@ -115,9 +209,26 @@ async def detect_language_and_translate(query: str) -> tuple[str, str]:
     # If API key is missing, just return original and assume English
     if not api_key:
         return query, "en"
+    
+    key = query.strip().lower()
+    translation = _translation_cache.get(key)
+    if translation is None:
+        translation = await _inflight_translations.run(key, lambda: _detect_language_and_translate(query))
+    return translation or (query, "en")
+
+async def _detect_language_and_translate(query: str) -> Optional[tuple[str, str]]:
+    """
+    Ask GPT to detect a query's language and translate it, caching the answer.
+    
+    Args:
+        query: The search query from the user
         
+    Returns:
+        A tuple of (translated_query, detected_language_code), or None if
+        translation failed
+    """
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": """
@@ -138,10 +249,11 @@ async def detect_language_and_translate(query: str) -> tuple[str, str]:
         
         if len(parts) == 2:
             lang_code, translated = parts
+            _translation_cache.set(query.strip().lower(), (translated, lang_code))
             return translated, lang_code
         else:
             print(f"Unexpected translation format: {result}")
-            return query, "en"
+            return None
     except Exception as e:
         print(f"Translation failed: {str(e)}")
-        return query, "en" 
\ No newline at end of file
+        return None 
\ No newline at end of file
@@ -1,10 +1,14 @@
 import os
-import httpx
 import re
+import logging
+from itertools import islice
 from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 from dotenv import load_dotenv
 from app.models.search_models import SearchResult, SearchFilters
+from app.services.http_client import request_with_retry
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -13,6 +17,20 @@ load_dotenv()
 HIPPOSTCARD_SEARCH_URL = "https://www.hippostcard.com/search"
 HIPPOSTCARD_AFFILIATE_ID = os.getenv("HIPPOSTCARD_AFFILIATE_ID", "")  # Affiliate ID if available
 
+# The search page is scraped, so requests identify as a regular browser
+HIPPOSTCARD_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Matches a decimal price, e.g. the 4.50 in "$4.50"
+_PRICE_RE = re.compile(r'(\d+\.\d+)')
+
+# Matches a four-digit year between 1800 and 2099
+_YEAR_RE = re.compile(r'(?:18|19|20)\d{2}')
+
+# Class of a search result listing, as raw bytes for a pre-parse check
+_LISTING_CLASS = b"postcard-item"
+
 # Use mock data for development
 USE_MOCK_DATA = False  # Set to False for production
 
@@ -50,100 +68,103 @@ async def search_hippostcard(query: str, filters: Optional[SearchFilters] = None
             if filters.price_max is not None:
                 params["max_price"] = filters.price_max
         
-        # Make HTTP request to HipPostcard search page
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            
-            response = await client.get(HIPPOSTCARD_SEARCH_URL, params=params, headers=headers)
-            
-            if response.status_code != 200:
-                print(f"HipPostcard search failed: {response.status_code}")
-                return []
-            
-            # Parse HTML response
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Find postcard listings
-            # Note: This is a placeholder implementation and would need to be updated
-            # based on the actual HTML structure of HipPostcard's search results page
-            listing_elements = soup.select(".postcard-item")  # Update selector based on actual HTML
-            
-            results = []
-            for i, element in enumerate(listing_elements):
-                if i >= limit:
-                    break
+        # Make HTTP request to HipPostcard search page, over the shared pooled client
+        response = await request_with_retry(
+            "GET", HIPPOSTCARD_SEARCH_URL, params=params, headers=HIPPOSTCARD_HEADERS
+        )
+        
+        if response.status_code != 200:
+            logger.warning("HipPostcard search failed: %s", response.status_code)
+            return []
+        
+        # Empty, error and no-results pages have no listings; a byte search
+        # for the listing class is far cheaper than building the DOM
+        if _LISTING_CLASS not in response.content:
+            logger.debug("No HipPostcard listings for query: %s", query)
+            return []
+        
+        # Parse HTML response with lexbor, which is much faster than BeautifulSoup
+        tree = LexborHTMLParser(response.text)
+        
+        # Find postcard listings
+        # Note: This is a placeholder implementation and would need to be updated
+        # based on the actual HTML structure of HipPostcard's search results page
+        listing_elements = tree.css(".postcard-item")  # Update selector based on actual HTML
+        
+        results = []
+        for element in islice(listing_elements, limit):
+            try:
+                # Extract data from HTML elements
+                # These selectors would need to be updated based on actual HTML structure
+                title_element = element.css_first(".postcard-title")
+                price_element = element.css_first(".postcard-price")
+                image_element = element.css_first(".postcard-image img")
+                link_element = element.css_first("a.postcard-link")
+                
+                title = title_element.text(strip=True) if title_element else "Untitled Postcard"
+                
+                # Extract price
+                price = 0.0
+                currency = "USD"
+                if price_element:
+                    price_text = price_element.text(strip=True)
+                    price_match = _PRICE_RE.search(price_text)
+                    if price_match:
+                        price = float(price_match.group(1))
                 
-                try:
-                    # Extract data from HTML elements
-                    # These selectors would need to be updated based on actual HTML structure
-                    title_element = element.select_one(".postcard-title")
-                    price_element = element.select_one(".postcard-price")
-                    image_element = element.select_one(".postcard-image img")
-                    link_element = element.select_one("a.postcard-link")
-                    
-                    title = title_element.text.strip() if title_element else "Untitled Postcard"
-                    
-                    # Extract price
-                    price = 0.0
-                    currency = "USD"
-                    if price_element:
-                        price_text = price_element.text.strip()
-                        price_match = re.search(r'(\d+\.\d+)', price_text)
-                        if price_match:
-                            price = float(price_match.group(1))
-                    
-                    # Get image URL
-                    image_url = ""
-                    if image_element and image_element.has_attr("src"):
-                        image_url = image_element["src"]
-                    
-                    # Get listing URL
-                    link = ""
-                    if link_element and link_element.has_attr("href"):
-                        link = link_element["href"]
-                        if not link.startswith("http"):
-                            link = f"https://www.hippostcard.com{link}"
-                    
-                    # Create affiliate link if affiliate ID is available
-                    affiliate_link = None
-                    if HIPPOSTCARD_AFFILIATE_ID and link:
-                        affiliate_link = f"{link}?ref={HIPPOSTCARD_AFFILIATE_ID}"
-                    
-                    # Extract date and location from title if available
-                    date = None
-                    location = None
-                    
-                    # Simple extraction - in a real app, use more sophisticated NLP
-                    year_match = re.search(r'(18|19|20)\d{2}', title)
-                    if year_match:
-                        date = year_match.group(0)
-                    
-                    # Create SearchResult
-                    result = SearchResult(
-                        source="HipPostcard",
-                        title=title,
-                        image_url=image_url,
-                        price=price,
-                        currency=currency,
-                        link=link,
-                        description="",  # No description available in search results
-                        date=date,
-                        location=location,
-                        affiliate_link=affiliate_link
-                    )
-                    
-                    results.append(result)
+                # Get image URL
+                image_url = ""
+                if image_element:
+                    image_url = image_element.attributes.get("src") or ""
                 
-                except Exception as e:
-                    print(f"Error parsing HipPostcard listing: {str(e)}")
-                    continue
+                # Get listing URL
+                link = ""
+                if link_element:
+                    link = link_element.attributes.get("href") or ""
+                    if link and not link.startswith("http"):
+                        link = f"https://www.hippostcard.com{link}"
+                
+                # Create affiliate link if affiliate ID is available
+                affiliate_link = None
+                if HIPPOSTCARD_AFFILIATE_ID and link:
+                    affiliate_link = f"{link}?ref={HIPPOSTCARD_AFFILIATE_ID}"
+                
+                # Extract date and location from title if available
+                date = None
+                year = None
+                location = None
+                
+                # Simple extraction - in a real app, use more sophisticated NLP
+                year_match = _YEAR_RE.search(title)
+                if year_match:
+                    date = year_match.group(0)
+                    year = int(date)
+                
+                # Create SearchResult
+                result = SearchResult(
+                    source="HipPostcard",
+                    title=title,
+                    image_url=image_url,
+                    price=price,
+                    currency=currency,
+                    link=link,
+                    description="",  # No description available in search results
+                    date=date,
+                    year=year,
+                    location=location,
+                    affiliate_link=affiliate_link
+                )
+                
+                results.append(result)
             
-            return results
+            except Exception as e:
+                logger.warning("Error parsing HipPostcard listing: %s", e)
+                continue
+        
+        return results
     
     except Exception as e:
-        print(f"HipPostcard search error: {str(e)}")
+        logger.warning("HipPostcard search error: %s", e)
         return []
 
 # Alternative implementation using a mock API response for development
@@ -162,9 +183,10 @@ async def search_hippostcard_mock(query: str, filters: Optional[SearchFilters] =
     """
     # Generate mock results based on query
     results = []
+    query_title = query.title()
     for i in range(min(limit, 10)):  # Generate up to 10 mock results
         # Create a mock title based on the query
-        title = f"Vintage Postcard - {query.title()} - {1900 + i*10}"
+        title = f"Vintage Postcard - {query_title} - {1900 + i*10}"
         
         # Create SearchResult with mock data
         result = SearchResult(
@@ -176,6 +198,7 @@ async def search_hippostcard_mock(query: str, filters: Optional[SearchFilters] =
             link=f"https://www.hippostcard.com/listing/{i}",
             description=f"Beautiful vintage postcard featuring {query}. Circa {1900 + i*10}.",
             date=str(1900 + i*10),
+            year=1900 + i*10,
             location=None,
             affiliate_link=None
         )
@@ -0,0 +1,89 @@
+import asyncio
+import random
+import httpx
+from typing import Optional
+
+# Shared HTTP client so marketplace calls reuse pooled keep-alive connections
+# instead of paying a new TCP + TLS handshake on every request. HTTP/2 lets
+# concurrent requests to the same host (token + search, prefetch + live
+# search) multiplex over a single connection.
+HTTP_TIMEOUT = 30.0
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+# Upstream statuses worth retrying, and the backoff applied between attempts
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5  # seconds, doubled after each attempt
+MAX_RETRY_DELAY = 5.0  # seconds, caps Retry-After as well
+
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it on first use.
+
+    The client is normally created by the FastAPI lifespan on startup, but is
+    created lazily here as well so services keep working outside the app
+    (scripts, tests, Lambda cold starts before lifespan runs).
+
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return _client
+
+async def close_http_client() -> None:
+    """
+    Close the shared HTTP client and release its pooled connections.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def request_with_retry(
+    method: str,
+    url: str,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    max_retries: int = MAX_RETRIES,
+    **kwargs
+) -> httpx.Response:
+    """
+    Send a request with the shared client, retrying transient upstream errors.
+    
+    Responses with a status in RETRY_STATUSES are retried with exponential
+    backoff and jitter, honoring Retry-After when the server sends one. The
+    optional semaphore bounds concurrent requests to a backend; it is only
+    held while a request is in flight, not while backing off.
+    
+    Args:
+        method: HTTP method
+        url: Request URL
+        semaphore: Optional per-backend concurrency limit
+        max_retries: Number of retries after the first attempt
+        **kwargs: Passed through to httpx.AsyncClient.request
+        
+    Returns:
+        The final httpx.Response (which may still be an error status)
+    """
+    client = get_http_client()
+    delay = RETRY_BASE_DELAY
+    
+    for attempt in range(max_retries + 1):
+        if semaphore is not None:
+            async with semaphore:
+                response = await client.request(method, url, **kwargs)
+        else:
+            response = await client.request(method, url, **kwargs)
+        
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+        
+        retry_after = response.headers.get("retry-after", "")
+        wait = float(retry_after) if retry_after.isdigit() else delay
+        await asyncio.sleep(min(wait, MAX_RETRY_DELAY) + random.uniform(0, delay / 2))
+        delay *= 2
+    
+    return response
@@ -1,29 +1,231 @@
 import os
-import base64
-import httpx
+import hashlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+from urllib.parse import urlparse
+import io
 import asyncio
 import time
-from typing import Optional, Dict, Any, List
+import random
+import logging
+from typing import Optional, Dict, Any, List, Union
 from dotenv import load_dotenv
-from openai import OpenAI
+from app.services.http_client import get_http_client
+from app.utils.cache import SingleFlight, TTLCache
+from openai import AsyncOpenAI, APIStatusError, BadRequestError, NotFoundError
 import re
+import orjson
+from PIL import Image
+from aiolimiter import AsyncLimiter
+
+logger = logging.getLogger(__name__)
+
+# pybase64 uses SIMD-accelerated encoders; fall back to the stdlib if missing
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
 API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=API_KEY)
+# Async client so Vision calls don't block the event loop; retries are handled
+# by the loop in extract_text_from_image
+client = AsyncOpenAI(api_key=API_KEY, timeout=60.0, max_retries=0)
 
 # Initialize OpenAI client
 if API_KEY:
-    print(f"OpenAI Vision API key available: {bool(API_KEY)}")
-    print(f"Using real OpenAI Vision API for text extraction")
+    logger.debug("Using real OpenAI Vision API for text extraction")
 else:
-    print("ERROR: OpenAI Vision API key not found. Text extraction will fail!")
+    logger.error("OpenAI Vision API key not found. Text extraction will fail!")
+
+# Concurrency limits for Vision API calls and image downloads
+VISION_CONCURRENCY = int(os.getenv("VISION_CONCURRENCY", "8"))
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "16"))
+_VISION_SEM = asyncio.Semaphore(VISION_CONCURRENCY)
+
+# Requests-per-second cap for Vision calls. The semaphore bounds how many are
+# in flight, but short calls can still burst past the account's rate limit.
+VISION_MAX_RPS = float(os.getenv("VISION_MAX_RPS", "8"))
+_VISION_RATE_LIMITER = AsyncLimiter(max_rate=VISION_MAX_RPS, time_period=1.0)
+_DL_SEM = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+# Mock/placeholder image hosts (and their subdomains) that are never downloaded
+_PLACEHOLDER_HOSTS = frozenset({"placehold.co", "example.com", "dummyimage.com"})
+
+# Marketplace CDNs serve the same photo at several sizes; the size part of
+# the path is normalized away so every variant shares one analysis
+_CDN_SIZE_PATTERNS = {
+    "i.ebayimg.com": (re.compile(r"/s-l\d+\.\w+$"), "/s-l"),  # s-l64.jpg ... s-l1600.webp
+    "i.etsystatic.com": (re.compile(r"/il_(?:\d+x\w+|fullxfull)\."), "/il_."),  # il_570xN., il_fullxfull.
+}
+
+# Largest image body download_image will accept
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+# Vision models: o1 reads postcard text best, but isn't available to every API key
+PREFERRED_VISION_MODEL = "o1"
+FALLBACK_VISION_MODEL = "gpt-4o"
+_preferred_model: Optional[str] = None  # resolved on first use
+
+# Images are downscaled to this long edge before upload; Vision tiles larger
+# images at "high" detail, so bigger uploads cost more, and postcard text
+# reads no better above ~1024px
+VISION_MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "1024"))
+VISION_JPEG_QUALITY = 85
+
+# Prompts for postcard text extraction
+EXTRACTION_SYSTEM_PROMPT = "You are a VERBATIM text extraction system for postcards. Your ONLY task is to extract the EXACT text visible in the image with 100% accuracy. NEVER invent, modify, or hallucinate text that is not visibly present in the image. If you're not certain about text, respond with NO_TEXT_FOUND. DO NOT refer to similar postcards or make educated guesses. Only report what you can clearly read."
+EXTRACTION_USER_PROMPT = "Read and transcribe ALL text visible in this postcard image EXACTLY as it appears, preserving formatting and line breaks. Don't add any information not clearly visible. If no text is visible or readable, respond with NO_TEXT_FOUND."
+
+# Batch extraction sends several images in one request; the model answers with
+# a JSON array holding one transcription per image
+MAX_IMAGES_PER_REQUEST = 8
+BATCH_EXTRACTION_PROMPT = "Read and transcribe ALL text visible in each of these {count} postcard images EXACTLY as it appears, preserving formatting and line breaks. Don't add any information not clearly visible. Respond with ONLY a JSON array of {count} strings, one per image in the order given. Use NO_TEXT_FOUND for any image with no visible or readable text."
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+# Race both models and take whichever answers first. Cuts tail latency at the
+# cost of roughly double the Vision tokens, so it's off by default.
+HEDGE_VISION_MODELS = os.getenv("HEDGE_VISION_MODELS", "").lower() in ("1", "true", "yes")
+
+# Retry backoff for Vision calls: jittered so parallel workers don't retry in lockstep
+RETRY_BASE_DELAY = 0.2  # seconds
+MAX_RETRY_DELAY = 30.0  # seconds
+
+# In-memory cache to avoid reprocessing the same images, bounded so a
+# long-running worker doesn't grow without limit
+IMAGE_TEXT_CACHE_SIZE = int(os.getenv("IMAGE_TEXT_CACHE_SIZE", "10000"))
+image_text_cache = TTLCache(maxsize=IMAGE_TEXT_CACHE_SIZE)
+_inflight_analyses = SingleFlight()
+
+# Phrases the model uses when it can't find any text, checked as one alternation
+_NO_TEXT_PATTERNS = (
+    r'no text (found|detected|visible|present|identified)',
+    r'(cannot|couldn\'t|could not|unable to) (detect|find|see|identify|read) (any )?text',
+    r'(no|not) (any|a single)? (visible|readable|detectable|recognizable) text',
+    r'the image (does not|doesn\'t) contain any (visible|readable) text',
+    r'i (can\'t|cannot|am unable to) (read|see|detect|extract|find) (any )?text',
+    r'(i\'m sorry|unfortunately)',
+    r'i don\'t see any text',
+    r'there is no (text|writing)',
+    r'(image|postcard) (contains|has) no text',
+    r'not able to extract',
+    r'not clear enough'
+)
+_NO_TEXT_RE = re.compile("|".join(f"(?:{p})" for p in _NO_TEXT_PATTERNS), re.IGNORECASE)
+
+# Every _NO_TEXT_RE match contains one of these, so responses that actually
+# carry text (the common case) skip the regex entirely
+_NO_TEXT_KEYWORDS = (
+    "no text", "cannot", "can't", "couldn't", "could not", "unable",
+    "visible text", "readable text", "detectable text", "recognizable text",
+    "contain any", "sorry", "unfortunately", "don't see", "there is no",
+    "not able", "not clear"
+)
+
+# Patterns stripped from the model's response, applied in order. Earlier
+# passes change what later ones see (e.g. the prefix is only stripped once
+# code blocks are gone, and before asides are), so they stay separate passes;
+# bracketed asides and "Note:" lines are fused because either order gives
+# the same result.
+_CODE_BLOCK_RE = re.compile(r'```.*?```', re.DOTALL)
+_ASIDE_RE = re.compile(r'\[.*?\]|\(.*?\)|Note:.*?$', re.MULTILINE)
+_COMMENTARY_RE = re.compile(
+    r'(\[|\(|\{\s*)(note|comment|text is|appears to be|might be|seems to be|text quality|partially visible).*?(\]|\)|\})\s*',
+    re.IGNORECASE
+)
+_APOLOGY_RE = re.compile(r'(I\'m sorry|Unfortunately).*?(visible|available|detected|found|present)\.?', re.IGNORECASE)
+_PREFIX_RE = re.compile(r'^(Text:|The text reads:|Visible text:|Postcard text:|The postcard shows:)')
+_EXCESS_NL_RE = re.compile(r'\n{3,}')
+_BLANK_LINES_RE = re.compile(r'\n{2,}')
+
+# Persistent cache so extractions survive restarts. Keys are "img:<digest>"
+# -> text, plus a "url:<image url>" -> digest index so the lookup can happen
+# before downloading. The digest is the sha256 of the image bytes for
+# downloaded images, so identical images under different URLs share one
+# entry; images OpenAI fetched by URL were never downloaded, so theirs is a
+# hash of the URL and they aren't deduplicated by content.
+IMAGE_TEXT_CACHE_PATH = os.getenv(
+    "IMAGE_TEXT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "postcard_image_text.sqlite3")
+)
+_cache_db: Optional[sqlite3.Connection] = None
 
-# In-memory cache to avoid reprocessing the same images
-image_text_cache = {}
+# All database work runs on this one thread, off the event loop; a single
+# thread also serializes access to the shared connection
+_cache_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-text-cache")
+
+def _cache_conn() -> sqlite3.Connection:
+    """Open the persistent cache database on first use."""
+    global _cache_db
+    if _cache_db is None:
+        _cache_db = sqlite3.connect(IMAGE_TEXT_CACHE_PATH, check_same_thread=False)
+        _cache_db.execute("PRAGMA journal_mode=WAL")
+        _cache_db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, val TEXT)")
+        _cache_db.commit()
+    return _cache_db
+
+def _cache_get_sync(key: str) -> Optional[str]:
+    """Look up a key in the persistent cache, treating database errors as a miss."""
+    try:
+        row = _cache_conn().execute("SELECT val FROM kv WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("Image text cache read failed: %s", e)
+        return None
+    return row[0] if row else None
+
+def _cache_put_sync(items: Dict[str, str]) -> None:
+    """Store keys in the persistent cache in one transaction, ignoring database errors."""
+    try:
+        with _cache_conn() as conn:
+            conn.executemany("INSERT OR REPLACE INTO kv (key, val) VALUES (?, ?)", items.items())
+    except sqlite3.Error as e:
+        logger.warning("Image text cache write failed: %s", e)
+
+def _lookup_persisted_sync(image_urls: List[str]) -> List[Optional[str]]:
+    """Look up persisted text for several image URLs, via the URL -> digest index."""
+    texts = []
+    for image_url in image_urls:
+        digest = _cache_get_sync(f"url:{image_url}")
+        texts.append(_cache_get_sync(f"img:{digest}") if digest else None)
+    return texts
+
+async def _cache_get(key: str) -> Optional[str]:
+    """Look up a key in the persistent cache on the cache thread."""
+    return await asyncio.get_running_loop().run_in_executor(_cache_executor, _cache_get_sync, key)
+
+async def _cache_put(items: Dict[str, str]) -> None:
+    """Store keys in the persistent cache in one transaction on the cache thread."""
+    await asyncio.get_running_loop().run_in_executor(_cache_executor, _cache_put_sync, items)
+
+def _is_placeholder_image(image_url: str) -> bool:
+    """Check whether an image URL points at a mock or placeholder image service."""
+    host = urlparse(image_url).hostname or ""
+    return host in _PLACEHOLDER_HOSTS or host.partition(".")[2] in _PLACEHOLDER_HOSTS
+
+def canonical_url(image_url: str) -> str:
+    """
+    Normalize an image URL so size variants of the same photo compare equal.
+    
+    The result is only meant for grouping URLs, not for fetching.
+    
+    Args:
+        image_url: URL of the image
+        
+    Returns:
+        Canonical form of the URL
+    """
+    parts = urlparse(image_url)
+    host = (parts.hostname or "").lower()
+    size_pattern = _CDN_SIZE_PATTERNS.get(host)
+    if size_pattern is None:
+        return parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()).geturl()
+    
+    # Query strings on these CDNs are resize/cache hints, not part of the image
+    pattern, replacement = size_pattern
+    return f"https://{host}{pattern.sub(replacement, parts.path)}"
 
 async def download_image(image_url: str) -> Optional[bytes]:
     """
@@ -35,25 +237,278 @@ async def download_image(image_url: str) -> Optional[bytes]:
     Returns:
         Image data as bytes or None if download fails
     """
+    image_data = await _download_image_buffer(image_url)
+    return bytes(image_data) if image_data is not None else None
+
+class ImageDownloadError(Exception):
+    """Raised when an image can't be downloaded for text extraction."""
+
+async def download_and_extract_text(image_url: str) -> Optional[str]:
+    """
+    Download an image and extract its text, without copying the downloaded
+    bytes into a separate buffer first.
+    
+    Args:
+        image_url: URL of the image
+        
+    Returns:
+        Extracted text or None if extraction fails
+        
+    Raises:
+        ImageDownloadError: If the image couldn't be downloaded
+    """
+    image_data = await _download_image_buffer(image_url)
+    if image_data is None:
+        raise ImageDownloadError(f"Failed to download image from {image_url}")
+    return await extract_text_from_image(image_data)
+
+async def _download_image_buffer(image_url: str) -> Optional[bytearray]:
+    """
+    Download an image into the buffer it was streamed into.
+    
+    Pillow, hashlib and base64 all accept the bytearray as is, so callers
+    that only read the image can skip download_image's copy to bytes.
+    
+    Args:
+        image_url: URL of the image
+        
+    Returns:
+        Image data or None if download fails
+    """
     try:
+        # Only fetch http(s) URLs
+        if not image_url.startswith(("http://", "https://")):
+            logger.debug("Skipping download for non-HTTP image URL: %.50s", image_url)
+            return None
+        
         # Skip download for mock or placeholder images
-        if "placehold.co" in image_url or "example.com" in image_url or "dummyimage.com" in image_url:
-            print(f"Skipping download for placeholder image: {image_url}")
+        if _is_placeholder_image(image_url):
+            logger.debug("Skipping download for placeholder image: %s", image_url)
             return None
             
-        # Add a timeout to prevent hanging downloads
-        async with httpx.AsyncClient() as client:
-            response = await client.get(image_url, timeout=10.0)
-            if response.status_code != 200:
-                print(f"Failed to download image from {image_url}: {response.status_code}")
-                return None
+        # Use the shared pooled client, with a timeout to prevent hanging downloads.
+        # Stream the body so an oversized response is abandoned early instead
+        # of being read fully into memory.
+        async with _DL_SEM:
+            async with get_http_client().stream(
+                "GET", image_url, timeout=10.0, headers={"Accept": "image/*"}
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning("Failed to download image from %s: %s", image_url, response.status_code)
+                    return None
                 
-            return response.content
+                buf = bytearray()
+                async for chunk in response.aiter_bytes(65536):
+                    buf.extend(chunk)
+                    if len(buf) > MAX_IMAGE_BYTES:
+                        logger.warning("Image at %s exceeds %s bytes, skipping", image_url, MAX_IMAGE_BYTES)
+                        return None
+                
+                return buf
     except Exception as e:
-        print(f"Error downloading image from {image_url}: {str(e)}")
+        logger.warning("Error downloading image from %s: %s", image_url, e)
         return None
 
-async def extract_text_from_image(image_data: bytes) -> Optional[str]:
+async def _get_preferred_model() -> str:
+    """
+    Get the Vision model to use, checking once whether o1 is available.
+    
+    Returns:
+        PREFERRED_VISION_MODEL if this API key can use it, else FALLBACK_VISION_MODEL
+    """
+    if _preferred_model is None:
+        try:
+            await client.models.retrieve(PREFERRED_VISION_MODEL)
+            _set_preferred_model(PREFERRED_VISION_MODEL)
+        except NotFoundError:
+            _set_preferred_model(FALLBACK_VISION_MODEL)
+        except Exception as e:
+            # Don't cache the answer on transient errors; assume o1 for this call
+            logger.warning("Could not check %s availability: %s", PREFERRED_VISION_MODEL, e)
+            return PREFERRED_VISION_MODEL
+    return _preferred_model
+
+def _set_preferred_model(model: str) -> None:
+    """Remember which Vision model to use for subsequent calls."""
+    global _preferred_model
+    _preferred_model = model
+
+def _build_messages(image_ref: str) -> List[Dict[str, Any]]:
+    """
+    Build the Vision chat messages for one image.
+    
+    Args:
+        image_ref: Image URL or base64 data URI
+        
+    Returns:
+        Chat messages usable with either Vision model
+    """
+    return [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": EXTRACTION_USER_PROMPT},
+                {"type": "image_url", "image_url": {"url": image_ref, "detail": "high"}}
+            ]
+        }
+    ]
+
+def _build_batch_messages(image_refs: List[str]) -> List[Dict[str, Any]]:
+    """
+    Build the Vision chat messages for several images in one request.
+    
+    Args:
+        image_refs: Image URLs or base64 data URIs
+        
+    Returns:
+        Chat messages asking for a JSON array of transcriptions
+    """
+    content = [{"type": "text", "text": BATCH_EXTRACTION_PROMPT.format(count=len(image_refs))}]
+    content.extend(
+        {"type": "image_url", "image_url": {"url": image_ref, "detail": "high"}}
+        for image_ref in image_refs
+    )
+    return [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {"role": "user", "content": content}
+    ]
+
+async def _create_completion(model: str, messages: List[Dict[str, Any]]) -> Any:
+    """
+    Send one Vision request under the shared rate limit and concurrency cap.
+    
+    Every OpenAI request takes its own limiter token and semaphore slot, so
+    hedged requests count twice against the limits.
+    
+    Args:
+        model: Vision model to use
+        messages: Chat messages to send
+        
+    Returns:
+        The chat completion response
+    """
+    # Bound request rate and in-flight Vision calls so fan-out doesn't trip rate limits
+    async with _VISION_RATE_LIMITER, _VISION_SEM:
+        return await client.chat.completions.create(model=model, messages=messages)
+
+async def _hedged_completion(messages: List[Dict[str, Any]]) -> Any:
+    """
+    Send the same request to both Vision models and return the first success.
+    
+    Args:
+        messages: Chat messages to send
+        
+    Returns:
+        The first successful completion, preferring o1 if both finish together
+        
+    Raises:
+        The last model error if both requests fail
+    """
+    tasks = [
+        asyncio.create_task(_create_completion(model, messages))
+        for model in (PREFERRED_VISION_MODEL, FALLBACK_VISION_MODEL)
+    ]
+    pending = set(tasks)
+    error = None
+    
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Walk in preference order so o1 wins ties
+            for task in tasks:
+                if task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def _complete(messages: List[Dict[str, Any]]) -> Any:
+    """
+    Send a Vision request with the preferred model, or race both if hedging.
+    
+    Args:
+        messages: Chat messages to send
+        
+    Returns:
+        The chat completion response
+    """
+    if HEDGE_VISION_MODELS:
+        logger.debug("Racing Vision models")
+        return await _hedged_completion(messages)
+    
+    model = await _get_preferred_model()
+    try:
+        logger.debug("Using %s model", model)
+        response = await _create_completion(model, messages)
+    except NotFoundError:
+        # Only a missing model warrants switching; other errors are retried as-is
+        if model == FALLBACK_VISION_MODEL:
+            raise
+        logger.info("Model %s not available, falling back to %s", model, FALLBACK_VISION_MODEL)
+        _set_preferred_model(FALLBACK_VISION_MODEL)
+        response = await _create_completion(FALLBACK_VISION_MODEL, messages)
+    return response
+
+def _backoff_delay(error: Optional[Exception], retry_delay: float) -> float:
+    """
+    Compute how long to wait before retrying a Vision request.
+    
+    Args:
+        error: Exception raised by the failed attempt, if any
+        retry_delay: Current backoff base in seconds
+        
+    Returns:
+        Seconds to sleep, honoring Retry-After on rate-limited responses
+    """
+    wait = random.uniform(0.1, retry_delay * 3)
+    
+    # RateLimitError and other HTTP errors carry the response headers
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after", "")
+        try:
+            wait = max(wait, float(retry_after))
+        except ValueError:
+            pass
+    
+    return min(wait, MAX_RETRY_DELAY)
+
+def _shrink_for_vision(image_data: Union[bytes, bytearray], max_edge: int = VISION_MAX_EDGE) -> Union[bytes, bytearray]:
+    """
+    Downscale an image so its long edge is at most max_edge, re-encoded as JPEG.
+    
+    Blocking (Pillow decode/encode), so call it via asyncio.to_thread.
+    
+    Args:
+        image_data: Image as bytes
+        max_edge: Maximum width/height in pixels
+        
+    Returns:
+        Downscaled JPEG bytes, or the original bytes if already small enough
+        or not decodable
+    """
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            if max(image.size) <= max_edge:
+                return image_data
+            
+            # Let the JPEG decoder scale down while decoding (no-op for other formats)
+            image.draft("RGB", (max_edge, max_edge))
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            
+            buf = io.BytesIO()
+            image.save(buf, "JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+            return buf.getvalue()
+    except Exception as e:
+        logger.debug("Could not downscale image, sending original: %s", e)
+        return image_data
+
+async def extract_text_from_image(image_data: Union[bytes, bytearray]) -> Optional[str]:
     """
     Extract text from an image using OpenAI's Vision model.
     Optimized for postcard text extraction.
@@ -61,168 +516,215 @@ async def extract_text_from_image(image_data: bytes) -> Optional[str]:
     Args:
         image_data: Image as bytes
         
+    Returns:
+        Extracted text or None if extraction fails
+    """
+    image_data = await asyncio.to_thread(_shrink_for_vision, image_data)
+    
+    # Convert image to a base64 data URI. The SDK only accepts str URLs, so
+    # decode as ASCII, which is all base64 output can contain and skips
+    # UTF-8 validation.
+    data_uri = "data:image/jpeg;base64," + base64.b64encode(image_data).decode('ascii')
+    
+    try:
+        return await _extract_text(data_uri)
+    except BadRequestError as e:
+        logger.warning("OpenAI rejected the image: %s", e)
+        return None
+
+async def extract_text_from_url(image_url: str) -> Optional[str]:
+    """
+    Extract text from a publicly reachable image, letting OpenAI fetch it.
+    
+    Args:
+        image_url: Public URL of the image
+        
+    Returns:
+        Extracted text or None if extraction fails
+        
+    Raises:
+        BadRequestError: If OpenAI can't fetch or decode the image
+    """
+    return await _extract_text(image_url)
+
+def _clean_extracted_text(extracted_text: str) -> Optional[str]:
+    """
+    Clean a Vision response down to the postcard's text.
+    
+    Args:
+        extracted_text: Raw text returned by the model
+        
+    Returns:
+        Cleaned text, or None if the model reported no readable text
+    """
+    # Check for standardized "no text" response
+    if extracted_text == "NO_TEXT_FOUND" or extracted_text.lower() == "no_text_found":
+        logger.debug("OpenAI Vision API reported no text in the image")
+        return None
+    
+    # Enhanced detection of various "no text" phrases
+    lower_text = extracted_text.lower()
+    if any(k in lower_text for k in _NO_TEXT_KEYWORDS) and _NO_TEXT_RE.search(lower_text):
+        logger.debug("OpenAI Vision API reported no text in the image (matched pattern)")
+        return None
+    
+    # Remove markdown code blocks, then any "Text:"-style prefix
+    cleaned_text = _CODE_BLOCK_RE.sub('', extracted_text)
+    cleaned_text = _PREFIX_RE.sub('', cleaned_text).strip()
+    
+    # Remove comments, explanations and notes, then excess newlines
+    cleaned_text = _ASIDE_RE.sub('', cleaned_text)
+    cleaned_text = _EXCESS_NL_RE.sub('\n\n', cleaned_text)
+    
+    # Remove commentary about text quality and apologies about missing text
+    cleaned_text = _COMMENTARY_RE.sub('', cleaned_text)
+    cleaned_text = _APOLOGY_RE.sub('', cleaned_text)
+    
+    # Final cleanup of whitespace and unnecessary characters
+    cleaned_text = cleaned_text.strip()
+    if cleaned_text.startswith('"') and cleaned_text.endswith('"'):
+        cleaned_text = cleaned_text[1:-1]
+    
+    # If after cleaning, the text is very short or empty, treat as no text
+    if not cleaned_text or len(cleaned_text) < 3:
+        logger.debug("After cleaning, text was too short or empty")
+        return None
+        
+    logger.debug("Successfully extracted text (%d chars): %.100r", len(cleaned_text), cleaned_text)
+    return cleaned_text
+
+async def _extract_text(image_ref: str) -> Optional[str]:
+    """
+    Run Vision text extraction with retries.
+    
+    Args:
+        image_ref: Image URL or base64 data URI to send to OpenAI
+        
     Returns:
         Extracted text or None if extraction fails
     """
     if not API_KEY:
-        print("ERROR: Cannot extract text - OpenAI API key is not set")
+        logger.error("Cannot extract text - OpenAI API key is not set")
         return None
         
+    messages = _build_messages(image_ref)
     max_retries = 3
-    retry_delay = 1.0  # Initial delay in seconds
+    retry_delay = RETRY_BASE_DELAY  # Initial delay in seconds
     
     for attempt in range(max_retries):
         try:
-            print(f"DEBUG: Converting image to base64 (Attempt {attempt+1}/{max_retries})")
-            # Convert image to base64
-            base64_image = base64.b64encode(image_data).decode('utf-8')
-            
-            print(f"DEBUG: Sending request to OpenAI Vision API (Attempt {attempt+1}/{max_retries})")
+            logger.debug("Sending request to OpenAI Vision API (attempt %d/%d)", attempt + 1, max_retries)
             
-            # First try with o1 model for better visual text recognition
-            try:
-                print("DEBUG: Trying o1 model")
-                response = client.chat.completions.create(
-                    model="o1",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a VERBATIM text extraction system for postcards. Your ONLY task is to extract the EXACT text visible in the image with 100% accuracy. NEVER invent, modify, or hallucinate text that is not visibly present in the image. If you're not certain about text, respond with NO_TEXT_FOUND. DO NOT refer to similar postcards or make educated guesses. Only report what you can clearly read."
-                        },
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": "Read and transcribe ALL text visible in this postcard image EXACTLY as it appears, preserving formatting and line breaks. Don't add any information not clearly visible. If no text is visible or readable, respond with NO_TEXT_FOUND."
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{base64_image}",
-                                        "detail": "high"
-                                    }
-                                }
-                            ]
-                        }
-                    ]
-                )
-                print("DEBUG: Successfully used o1 model")
-            except Exception as o1_error:
-                print(f"DEBUG: Error using o1 model: {str(o1_error)}, falling back to gpt-4o")
-                # Fall back to gpt-4o if o1 fails
-                response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a VERBATIM text extraction system for postcards. Your ONLY task is to extract the EXACT text visible in the image with 100% accuracy. NEVER invent, modify, or hallucinate text that is not visibly present in the image. If you're not certain about text, respond with NO_TEXT_FOUND. DO NOT refer to similar postcards or make educated guesses. Only report what you can clearly read."
-                        },
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": "Read and transcribe ALL text visible in this postcard image EXACTLY as it appears, preserving formatting and line breaks. Don't add any information not clearly visible. If no text is visible or readable, respond with NO_TEXT_FOUND."
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{base64_image}",
-                                        "detail": "high"
-                                    }
-                                }
-                            ]
-                        }
-                    ]
-                )
+            response = await _complete(messages)
             
-            print(f"DEBUG: Received response from OpenAI Vision API (Attempt {attempt+1}/{max_retries})")
+            logger.debug("Received response from OpenAI Vision API (attempt %d/%d)", attempt + 1, max_retries)
             
             # Validate the response
             if not response.choices or not response.choices[0].message or not response.choices[0].message.content:
-                print(f"ERROR: Empty or invalid response from OpenAI API (Attempt {attempt+1}/{max_retries})")
+                logger.warning("Empty or invalid response from OpenAI API (attempt %d/%d)", attempt + 1, max_retries)
                 if attempt < max_retries - 1:
-                    print(f"DEBUG: Retrying in {retry_delay} seconds...")
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
+                    wait = _backoff_delay(None, retry_delay)
+                    logger.debug("Retrying in %.2f seconds", wait)
+                    await asyncio.sleep(wait)
+                    retry_delay = min(MAX_RETRY_DELAY, retry_delay * 2)  # Exponential backoff
                 continue
                 
             extracted_text = response.choices[0].message.content.strip()
+            return _clean_extracted_text(extracted_text)
             
-            # Check for standardized "no text" response
-            if extracted_text == "NO_TEXT_FOUND" or extracted_text.lower() == "no_text_found":
-                print("DEBUG: OpenAI Vision API reported no text in the image")
-                return None
-            
-            # Enhanced detection of various "no text" phrases
-            no_text_patterns = [
-                r'no text (found|detected|visible|present|identified)',
-                r'(cannot|couldn\'t|could not|unable to) (detect|find|see|identify|read) (any )?text',
-                r'(no|not) (any|a single)? (visible|readable|detectable|recognizable) text',
-                r'the image (does not|doesn\'t) contain any (visible|readable) text',
-                r'i (can\'t|cannot|am unable to) (read|see|detect|extract|find) (any )?text',
-                r'(i\'m sorry|unfortunately)',
-                r'i don\'t see any text',
-                r'there is no (text|writing)',
-                r'(image|postcard) (contains|has) no text',
-                r'not able to extract',
-                r'not clear enough'
-            ]
-            
-            for pattern in no_text_patterns:
-                if re.search(pattern, extracted_text.lower()):
-                    print("DEBUG: OpenAI Vision API reported no text in the image (matched pattern)")
-                    return None
-            
-            # Clean up the extracted text
-            # Remove markdown code blocks if present
-            cleaned_text = re.sub(r'```.*?```', '', extracted_text, flags=re.DOTALL)
-            
-            # Remove common prefixes that might be added
-            cleaned_text = re.sub(r'^(Text:|The text reads:|Visible text:|Postcard text:|The postcard shows:)', '', cleaned_text).strip()
-            
-            # Remove any comments, explanations or notes
-            cleaned_text = re.sub(r'\[.*?\]|\(.*?\)', '', cleaned_text)
-            cleaned_text = re.sub(r'Note:.*?$', '', cleaned_text, flags=re.MULTILINE)
-            
-            # Replace excess newlines
-            cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
-            
-            # Remove any commentary about text quality or explanations
-            cleaned_text = re.sub(r'(\[|\(|\{\s*)(note|comment|text is|appears to be|might be|seems to be|text quality|partially visible).*?(\]|\)|\})\s*', '', 
-                                 cleaned_text, flags=re.IGNORECASE)
-            
-            # Remove any statements about not being able to see text
-            cleaned_text = re.sub(r'(I\'m sorry|Unfortunately).*?(visible|available|detected|found|present)\.?', '', 
-                                 cleaned_text, flags=re.IGNORECASE)
-            
-            # Final cleanup of whitespace and unnecessary characters
-            cleaned_text = cleaned_text.strip()
-            if cleaned_text.startswith('"') and cleaned_text.endswith('"'):
-                cleaned_text = cleaned_text[1:-1]
-            
-            # If after cleaning, the text is very short or empty, treat as no text
-            if not cleaned_text or len(cleaned_text) < 3:
-                print("DEBUG: After cleaning, text was too short or empty")
-                return None
-                
-            print(f"DEBUG: Successfully extracted text ({len(cleaned_text)} chars): '{cleaned_text[:100]}...'")
-            return cleaned_text
-            
+        except BadRequestError:
+            # Invalid requests (e.g. an image OpenAI can't fetch) won't succeed on retry
+            raise
         except Exception as e:
-            print(f"ERROR: Exception in text extraction (attempt {attempt+1}/{max_retries}): {str(e)}")
+            logger.warning("Exception in text extraction (attempt %d/%d): %s", attempt + 1, max_retries, e)
             if attempt < max_retries - 1:
-                print(f"DEBUG: Retrying in {retry_delay} seconds...")
-                await asyncio.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
+                wait = _backoff_delay(e, retry_delay)
+                logger.debug("Retrying in %.2f seconds", wait)
+                await asyncio.sleep(wait)
+                retry_delay = min(MAX_RETRY_DELAY, retry_delay * 2)  # Exponential backoff
             
-    print("ERROR: All extraction attempts failed")
+    logger.error("All extraction attempts failed")
     return None
 
+async def extract_text_from_images(images: List[bytes]) -> List[Optional[str]]:
+    """
+    Extract text from several images, sending up to MAX_IMAGES_PER_REQUEST
+    images per Vision request instead of one request per image.
+    
+    Args:
+        images: Images as bytes
+        
+    Returns:
+        Extracted text (or None) for each image, in the same order
+    """
+    batches = [
+        images[i:i + MAX_IMAGES_PER_REQUEST]
+        for i in range(0, len(images), MAX_IMAGES_PER_REQUEST)
+    ]
+    results = await asyncio.gather(*(_extract_text_batch(batch) for batch in batches))
+    return [text for batch_texts in results for text in batch_texts]
+
+async def _extract_text_batch(images: List[bytes]) -> List[Optional[str]]:
+    """
+    Extract text from one batch of images with a single Vision request.
+    
+    Falls back to one request per image if the model's answer can't be
+    matched up with the images.
+    
+    Args:
+        images: Images as bytes, at most MAX_IMAGES_PER_REQUEST
+        
+    Returns:
+        Extracted text (or None) for each image, in the same order
+    """
+    if not API_KEY:
+        logger.error("Cannot extract text - OpenAI API key is not set")
+        return [None] * len(images)
+    
+    if len(images) == 1:
+        return [await extract_text_from_image(images[0])]
+    
+    images = await asyncio.gather(*(asyncio.to_thread(_shrink_for_vision, image_data) for image_data in images))
+    data_uris = [
+        "data:image/jpeg;base64," + base64.b64encode(image_data).decode('ascii')
+        for image_data in images
+    ]
+    
+    texts = await _extract_refs_batch(data_uris)
+    if texts is None:
+        return list(await asyncio.gather(*(extract_text_from_image(image_data) for image_data in images)))
+    return texts
+
+async def _extract_refs_batch(image_refs: List[str]) -> Optional[List[Optional[str]]]:
+    """
+    Send a batch of image references (URLs or data URIs) in one Vision request.
+    
+    Args:
+        image_refs: Image URLs or data URIs, at most MAX_IMAGES_PER_REQUEST
+        
+    Returns:
+        Extracted text (or None) for each image in the same order, or None if
+        the request failed or the answer can't be matched up with the images
+    """
+    try:
+        logger.debug("Sending batch of %d images to OpenAI Vision API", len(image_refs))
+        response = await _complete(_build_batch_messages(image_refs))
+        content = response.choices[0].message.content or ""
+        texts = orjson.loads(_JSON_FENCE_RE.sub('', content.strip()))
+        if not isinstance(texts, list) or len(texts) != len(image_refs):
+            raise ValueError(f"expected {len(image_refs)} transcriptions, got {texts!r:.100}")
+    except Exception as e:
+        logger.info("Batch extraction failed (%s), extracting images one at a time", e)
+        return None
+    
+    return [
+        _clean_extracted_text(text.strip()) if isinstance(text, str) else None
+        for text in texts
+    ]
+
 async def analyze_image(image_url: str) -> Optional[str]:
     """
-    Download an image and extract text from it.
+    Extract text from an image, by URL where possible or by downloading it.
     
     Args:
         image_url: URL of the image
@@ -233,37 +735,171 @@ async def analyze_image(image_url: str) -> Optional[str]:
     try:
         # Skip empty or invalid URLs
         if not image_url or not isinstance(image_url, str):
-            print(f"DEBUG: Skipping invalid image URL: {image_url}")
+            logger.debug("Skipping invalid image URL: %s", image_url)
             return None
             
         # Check cache first
-        if image_url in image_text_cache:
-            print(f"DEBUG: Using cached text for image: {image_url}")
-            return image_text_cache[image_url]
-            
-        print(f"DEBUG: Starting download for image: {image_url[:50]}...")
-        # Download the image
-        image_data = await download_image(image_url)
-        if not image_data:
-            print(f"DEBUG: Failed to download image: {image_url[:50]}...")
-            return None
-            
-        print(f"DEBUG: Downloaded image ({len(image_data)/1024:.1f} KB), sending to OpenAI Vision API...")
-        # Extract text from the image using the Vision API
-        extracted_text = await extract_text_from_image(image_data)
+        cached_text = image_text_cache.get(image_url)
+        if cached_text is not None:
+            logger.debug("Using cached text for image: %s", image_url)
+            return cached_text
         
-        # Process the extracted text
-        if extracted_text:
-            # Clean up the text a bit (remove excessive newlines, etc.)
-            cleaned_text = re.sub(r'\n{2,}', '\n', extracted_text).strip()
-            
-            # Save to cache for future use
-            image_text_cache[image_url] = cleaned_text
-            print(f"DEBUG: Successfully extracted text ({len(cleaned_text)} chars): '{cleaned_text[:100]}...'")
-            return cleaned_text
+        # Concurrent requests for the same image share one download/Vision call
+        return await _inflight_analyses.run(image_url, lambda: _analyze_uncached_image(image_url))
+    except Exception:
+        logger.exception("Error analyzing image %.50s", image_url)
+        return None
+
+async def analyze_images_batch(image_urls: List[str]) -> List[Optional[str]]:
+    """
+    Extract text from several images, sending uncached public image URLs to
+    OpenAI together (up to MAX_IMAGES_PER_REQUEST per request) instead of one
+    Vision request per image.
+    
+    Args:
+        image_urls: URLs of the images
+        
+    Returns:
+        Extracted text (or None) for each image, in the same order
+    """
+    texts: List[Optional[str]] = [None] * len(image_urls)
+    batchable = []
+    single = []
+    uncached = []
+    for i, image_url in enumerate(image_urls):
+        if not image_url or not isinstance(image_url, str):
+            continue
+        texts[i] = image_text_cache.get(image_url)
+        if not texts[i]:
+            uncached.append(i)
+    
+    # Misses are looked up in the persistent cache in one trip to its thread
+    persisted_texts = await _get_persisted_texts([image_urls[i] for i in uncached])
+    for i, cached_text in zip(uncached, persisted_texts):
+        image_url = image_urls[i]
+        if cached_text:
+            texts[i] = cached_text
+        elif API_KEY and image_url.startswith(("http://", "https://")) and not _is_placeholder_image(image_url):
+            batchable.append(i)
         else:
-            print(f"DEBUG: No text extracted from image: {image_url[:50]}...")
-            return None
-    except Exception as e:
-        print(f"DEBUG: Error analyzing image {image_url[:50]}...: {str(e)}")
-        return None 
\ No newline at end of file
+            single.append(i)
+    
+    async def run_batch(indices: List[int]) -> None:
+        urls = [image_urls[i] for i in indices]
+        batch_texts = await _extract_refs_batch(urls) if len(urls) > 1 else None
+        if batch_texts is None:
+            # analyze_image also covers images OpenAI can't fetch by URL
+            batch_texts = await asyncio.gather(*(analyze_image(url) for url in urls))
+        else:
+            batch_texts = await asyncio.gather(*(_store_text(url, text) for url, text in zip(urls, batch_texts)))
+        for i, text in zip(indices, batch_texts):
+            texts[i] = text
+    
+    async def run_single(i: int) -> None:
+        texts[i] = await analyze_image(image_urls[i])
+    
+    await asyncio.gather(
+        *(run_batch(batchable[j:j + MAX_IMAGES_PER_REQUEST])
+          for j in range(0, len(batchable), MAX_IMAGES_PER_REQUEST)),
+        *(run_single(i) for i in single),
+    )
+    return texts
+
+async def _get_persisted_texts(image_urls: List[str]) -> List[Optional[str]]:
+    """
+    Look up images' text in the persistent cache, via the URL -> content
+    hash index, promoting hits into the in-memory cache.
+    
+    Args:
+        image_urls: URLs of the images
+        
+    Returns:
+        Persisted text (or None on a miss) for each image, in order
+    """
+    if not image_urls:
+        return []
+    
+    texts = await asyncio.get_running_loop().run_in_executor(_cache_executor, _lookup_persisted_sync, image_urls)
+    for image_url, cached_text in zip(image_urls, texts):
+        if cached_text:
+            logger.debug("Using persisted text for image: %s", image_url)
+            image_text_cache.set(image_url, cached_text)
+    return texts
+
+async def _store_text(image_url: str, extracted_text: Optional[str], digest: Optional[str] = None) -> Optional[str]:
+    """
+    Clean up extracted text and save it to the in-memory and persistent caches.
+    
+    Args:
+        image_url: URL of the image
+        extracted_text: Text returned by the Vision API, if any
+        digest: Content hash of the image; defaults to a hash of the URL for
+            images that were sent to OpenAI by URL
+        
+    Returns:
+        The cleaned text, or None if there was no text
+    """
+    if not extracted_text:
+        logger.debug("No text extracted from image: %.50s", image_url)
+        return None
+    
+    # Clean up the text a bit (remove excessive newlines, etc.)
+    cleaned_text = _BLANK_LINES_RE.sub('\n', extracted_text).strip()
+    if digest is None:
+        # Without the bytes, persist the text under a hash of the URL
+        digest = hashlib.sha256(image_url.encode()).hexdigest()
+    
+    # Save to cache for future use
+    image_text_cache.set(image_url, cleaned_text)
+    await _cache_put({f"img:{digest}": cleaned_text, f"url:{image_url}": digest})
+    logger.debug("Successfully extracted text (%d chars): %.100r", len(cleaned_text), cleaned_text)
+    return cleaned_text
+
+async def _analyze_uncached_image(image_url: str) -> Optional[str]:
+    """
+    Extract text from an image that isn't in the in-memory cache.
+    
+    Args:
+        image_url: URL of the image
+        
+    Returns:
+        Extracted text or None if extraction fails
+    """
+    # Check the persistent cache, via the URL -> content hash index
+    cached_text, = await _get_persisted_texts([image_url])
+    if cached_text:
+        return cached_text
+        
+    # Publicly reachable images are handed to OpenAI by URL, skipping the
+    # download and base64 round-trip. Placeholders, and images OpenAI
+    # can't fetch, fall back to downloading the bytes ourselves.
+    if image_url.startswith(("http://", "https://")) and not _is_placeholder_image(image_url):
+        try:
+            logger.debug("Sending image URL to OpenAI Vision API: %.50s", image_url)
+            extracted_text = await extract_text_from_url(image_url)
+            return await _store_text(image_url, extracted_text)
+        except BadRequestError as e:
+            logger.debug("OpenAI could not fetch %.50s, downloading instead: %s", image_url, e)
+    
+    logger.debug("Starting download for image: %.50s", image_url)
+    # Download the image
+    image_data = await _download_image_buffer(image_url)
+    if not image_data:
+        logger.debug("Failed to download image: %.50s", image_url)
+        return None
+    
+    # The same image is often served from several URLs (CDN variants,
+    # signed URLs), so check the cache by content before calling the API
+    digest = hashlib.sha256(image_data).hexdigest()
+    cached_text = await _cache_get(f"img:{digest}")
+    if cached_text:
+        logger.debug("Using persisted text for identical image: %s", image_url)
+        await _cache_put({f"url:{image_url}": digest})
+        image_text_cache.set(image_url, cached_text)
+        return cached_text
+    
+    logger.debug("Downloaded image (%.1f KB), sending to OpenAI Vision API", len(image_data) / 1024)
+    # Extract text from the image using the Vision API
+    extracted_text = await extract_text_from_image(image_data)
+    
+    return await _store_text(image_url, extracted_text, digest)
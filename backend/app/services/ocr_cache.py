@@ -0,0 +1,97 @@
+import os
+import hashlib
+import logging
+from typing import Optional
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Redis is optional - without it (or without REDIS_URL) the cache is a no-op
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+# Load environment variables
+load_dotenv()
+
+# Shared cache of extracted image text, so every worker and Lambda instance
+# benefits from text any of them has already extracted
+REDIS_URL = os.getenv("REDIS_URL")
+OCR_CACHE_TTL = 30 * 24 * 3600  # seconds; listing images rarely change
+KEY_PREFIX = "ocr:"
+
+_redis = None
+
+def is_enabled() -> bool:
+    """
+    Check whether the shared cache is available.
+
+    Returns:
+        True if REDIS_URL is set and redis is installed
+    """
+    return bool(REDIS_URL) and redis is not None
+
+def _get_redis():
+    """
+    Get the shared Redis client, creating it on first use.
+
+    Returns:
+        Redis client, or None if Redis isn't configured or installed
+    """
+    global _redis
+    if _redis is None and is_enabled():
+        _redis = redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis
+
+def _cache_key(url: str) -> str:
+    # sha1 truncated to 16 bytes keeps keys short while avoiding collisions
+    return KEY_PREFIX + hashlib.sha1(url.encode()).hexdigest()[:32]
+
+async def get(url: str) -> Optional[str]:
+    """
+    Look up extracted text for an image URL.
+
+    Args:
+        url: Image URL
+
+    Returns:
+        Cached text, or None on a miss or if the cache is unavailable
+    """
+    client = _get_redis()
+    if client is None:
+        return None
+
+    try:
+        return await client.get(_cache_key(url))
+    except Exception as e:
+        # A cache outage shouldn't break search
+        logger.warning("OCR cache read failed: %s", e)
+        return None
+
+async def put(url: str, text: str, ttl: int = OCR_CACHE_TTL) -> None:
+    """
+    Store extracted text for an image URL.
+
+    Args:
+        url: Image URL
+        text: Extracted text
+        ttl: Expiry in seconds
+    """
+    client = _get_redis()
+    if client is None:
+        return
+
+    try:
+        await client.set(_cache_key(url), text, ex=ttl)
+    except Exception as e:
+        logger.warning("OCR cache write failed: %s", e)
+
+async def close() -> None:
+    """
+    Close the Redis connection pool, if one was opened.
+    """
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
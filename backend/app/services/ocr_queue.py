@@ -0,0 +1,160 @@
+import os
+import logging
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+import orjson
+from dotenv import load_dotenv
+
+from app.services import ocr_cache
+
+logger = logging.getLogger(__name__)
+
+# aiobotocore is optional - without it (or without OCR_QUEUE_URL) image text
+# is extracted in-process by the web worker
+try:
+    from aiobotocore.session import get_session
+except ImportError:
+    get_session = None
+
+# Load environment variables
+load_dotenv()
+
+# SQS queue that hands image text extraction to a separate worker fleet
+# (app.ocr_worker), so searches don't spend web worker time on OCR
+OCR_QUEUE_URL = os.getenv("OCR_QUEUE_URL")
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+
+# SQS limits: at most 10 entries per batch send; URLs per message is our choice
+URLS_PER_MESSAGE = 10
+MESSAGES_PER_BATCH = 10
+
+_client = None
+_exit_stack: Optional[AsyncExitStack] = None
+
+def is_enabled() -> bool:
+    """
+    Check whether image text extraction should go through the queue.
+
+    Workers hand text back only through the shared OCR cache, so the queue
+    is used only when that cache is available too.
+
+    Returns:
+        True if a queue and the shared OCR cache are configured and
+        aiobotocore is installed
+    """
+    return bool(OCR_QUEUE_URL) and get_session is not None and ocr_cache.is_enabled()
+
+def check_config() -> None:
+    """
+    Log an error if OCR_QUEUE_URL is set but the queue can't be used, in
+    which case image text is extracted in-process instead.
+    """
+    if not OCR_QUEUE_URL:
+        return
+    if get_session is None:
+        logger.error("OCR_QUEUE_URL is set but aiobotocore is not installed; extracting image text in-process")
+    elif not ocr_cache.is_enabled():
+        logger.error("OCR_QUEUE_URL is set but REDIS_URL is not (or redis is not installed); extracting image text in-process")
+
+async def _get_client():
+    """
+    Get the shared SQS client, creating it on first use.
+
+    Returns:
+        aiobotocore SQS client
+    """
+    global _client, _exit_stack
+    if _client is None:
+        _exit_stack = AsyncExitStack()
+        _client = await _exit_stack.enter_async_context(
+            get_session().create_client("sqs", region_name=AWS_REGION)
+        )
+    return _client
+
+async def enqueue(search_id: str, urls: List[str]) -> bool:
+    """
+    Queue image URLs for text extraction by the OCR workers.
+
+    Args:
+        search_id: Search the images belong to
+        urls: Image URLs to extract text from
+
+    Returns:
+        True if every URL was queued, False if the queue is unavailable (the
+        caller should extract the text itself)
+    """
+    if not is_enabled() or not urls:
+        return False
+
+    bodies = [
+        orjson.dumps({"search_id": search_id, "urls": urls[i:i + URLS_PER_MESSAGE]}).decode()
+        for i in range(0, len(urls), URLS_PER_MESSAGE)
+    ]
+
+    try:
+        client = await _get_client()
+        for i in range(0, len(bodies), MESSAGES_PER_BATCH):
+            entries = [
+                {"Id": str(n), "MessageBody": body}
+                for n, body in enumerate(bodies[i:i + MESSAGES_PER_BATCH])
+            ]
+            response = await client.send_message_batch(QueueUrl=OCR_QUEUE_URL, Entries=entries)
+            if response.get("Failed"):
+                raise RuntimeError(f"{len(response['Failed'])} messages rejected")
+    except Exception as e:
+        logger.warning("OCR queue send failed: %s", e)
+        return False
+
+    logger.debug("Queued %d images in %d messages for search %s", len(urls), len(bodies), search_id)
+    return True
+
+async def receive(max_messages: int = MESSAGES_PER_BATCH, wait_seconds: int = 20) -> List[Dict[str, Any]]:
+    """
+    Long-poll the queue for OCR jobs.
+
+    Args:
+        max_messages: Maximum number of messages to return (at most 10)
+        wait_seconds: How long to wait for messages to arrive
+
+    Returns:
+        Jobs as dicts with search_id, urls and the receipt_handle needed to
+        delete the message once it is processed
+    """
+    client = await _get_client()
+    response = await client.receive_message(
+        QueueUrl=OCR_QUEUE_URL,
+        MaxNumberOfMessages=max_messages,
+        WaitTimeSeconds=wait_seconds,
+    )
+
+    jobs = []
+    for message in response.get("Messages", []):
+        try:
+            job = orjson.loads(message["Body"])
+        except orjson.JSONDecodeError:
+            logger.warning("Dropping malformed OCR queue message: %.100s", message["Body"])
+            await delete(message["ReceiptHandle"])
+            continue
+        job["receipt_handle"] = message["ReceiptHandle"]
+        jobs.append(job)
+    return jobs
+
+async def delete(receipt_handle: str) -> None:
+    """
+    Remove a processed message from the queue.
+
+    Args:
+        receipt_handle: Receipt handle returned with the message
+    """
+    client = await _get_client()
+    await client.delete_message(QueueUrl=OCR_QUEUE_URL, ReceiptHandle=receipt_handle)
+
+async def close() -> None:
+    """
+    Close the SQS client, if one was opened.
+    """
+    global _client, _exit_stack
+    if _exit_stack is not None:
+        await _exit_stack.aclose()
+        _client = None
+        _exit_stack = None
@@ -1,5 +1,10 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Pattern
 from app.models.search_models import SearchResult, SearchFilters
+from itertools import zip_longest
+import heapq
+import math
+from operator import attrgetter
+from functools import lru_cache
 import random
 import logging
 import re
@@ -7,6 +12,38 @@ import re
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Matches a four-digit year between 1800 and 2099 as a whole word
+_YEAR_WORD_RE = re.compile(r'\b(?:18|19|20)\d{2}\b')
+
+# List of common cities and countries for detect_location_in_text, matched
+# case-insensitively in one regex pass instead of one scan per location.
+# Longer names are tried first, so overlapping names match the longest one.
+COMMON_LOCATIONS = (
+    "New York", "Paris", "London", "Tokyo", "Berlin", "Rome", "Madrid",
+    "USA", "France", "UK", "Japan", "Germany", "Italy", "Spain",
+    "Chicago", "San Francisco", "Los Angeles", "Boston", "Washington",
+    "California", "Florida", "Texas", "New Jersey"
+)
+_LOCATIONS_BY_LOWER = {location.lower(): location for location in COMMON_LOCATIONS}
+_LOCATION_RE = re.compile(
+    "|".join(re.escape(location) for location in sorted(COMMON_LOCATIONS, key=len, reverse=True)),
+    re.IGNORECASE
+)
+
+# C-level key function for price sorts, avoiding a Python lambda call per item
+_price_key = attrgetter("price")
+
+def _year_sort_key(result: SearchResult) -> int:
+    """Sort key for "newest": the result's year, or 0 for results without one."""
+    return result.year or 0
+
+# Sort key and direction for each sort_by value other than "relevance"
+_SORT_ORDERS = {
+    "price_asc": (_price_key, False),
+    "price_desc": (_price_key, True),
+    "newest": (_year_sort_key, True),
+}
+
 def aggregate_results(
     result_lists: List[List[SearchResult]], 
     filters: Optional[SearchFilters] = None,
@@ -15,6 +52,11 @@ def aggregate_results(
     """
     Aggregate search results from multiple sources.
     
+    For relevance, results are interleaved across sources (so every source
+    is represented near the top). For other sort orders, each source is
+    sorted on its own and the sources are merged into one ordered stream.
+    Results are filtered and deduplicated in the same pass.
+    
     Args:
         result_lists: List of result lists from different sources
         filters: Optional filters to apply to the aggregated results
@@ -23,121 +65,101 @@ def aggregate_results(
     Returns:
         Combined and sorted list of search results
     """
-    # Combine all results
-    all_results = []
-    for results in result_lists:
-        all_results.extend(results)
-    
-    logger.debug(f"Total results before filtering: {len(all_results)}")
-    logger.debug(f"Filters applied: {filters}")
-    
-    # Sort results
-    if sort_by:
-        if sort_by == "price_asc":
-            all_results.sort(key=lambda x: x.price)
-        elif sort_by == "price_desc":
-            all_results.sort(key=lambda x: x.price, reverse=True)
-        elif sort_by == "newest":
-            # Sort by date if available (assuming newer dates are "greater")
-            # If date is not available, use a secondary sort key
-            def get_date_sort_key(result):
-                if result.date and re.match(r'^\d{4}$', result.date):
-                    return int(result.date)
-                return 0  # Default for results without a year
-                
-            all_results.sort(key=get_date_sort_key, reverse=True)
-        else:  # Default is "relevance" - already sorted by the individual APIs
-            # In a real-world implementation, you might want to re-score for relevance here
-            pass
-    
-    # Apply filters if provided
+    logger.debug("Filters applied: %s", filters)
+    
+    if sort_by in _SORT_ORDERS:
+        # Sources often come back sorted already, which makes their sorts
+        # close to linear; merging them is O(N log k) for k sources
+        sort_key, reverse = _SORT_ORDERS[sort_by]
+        candidates = heapq.merge(
+            *(sorted(results, key=sort_key, reverse=reverse) for results in result_lists),
+            key=sort_key,
+            reverse=reverse
+        )
+    else:
+        # "relevance" keeps the order the individual APIs returned
+        candidates = (result for row in zip_longest(*result_lists) for result in row if result is not None)
+    
     if filters:
-        filtered_result_lists = []
-        
-        # Process each source separately so we have results from all sources
-        for results in result_lists:
-            filtered_list = []
-            
-            for result in results:
-                include_result = True
-                
-                # Apply year filters if provided
-                if filters.year_min is not None and result.date:
-                    # Extract year from date string
-                    year_match = re.search(r'(18|19|20)\d{2}', result.date)
-                    if year_match:
-                        year = int(year_match.group(0))
-                        if year < filters.year_min:
-                            include_result = False
-                            logger.debug(f"Filtering out result with year {year} < {filters.year_min}")
-                            continue
-                
-                if filters.year_max is not None and result.date:
-                    # Extract year from date string
-                    year_match = re.search(r'(18|19|20)\d{2}', result.date)
-                    if year_match:
-                        year = int(year_match.group(0))
-                        if year > filters.year_max:
-                            include_result = False
-                            logger.debug(f"Filtering out result with year {year} > {filters.year_max}")
-                            continue
-                
-                # Apply location filter if provided
-                if filters.location and result.location:
-                    if filters.location.lower() not in result.location.lower():
-                        include_result = False
-                        logger.debug(f"Filtering out result with location {result.location} not matching {filters.location}")
-                        continue
-                
-                # Apply price filters if provided
-                if filters.price_min is not None:
-                    if result.price < filters.price_min:
-                        include_result = False
-                        logger.debug(f"Filtering out result with price {result.price} < {filters.price_min}")
-                        continue
-                    
-                if filters.price_max is not None:
-                    if result.price > filters.price_max:
-                        include_result = False
-                        logger.debug(f"Filtering out result with price {result.price} > {filters.price_max}")
-                        continue
-                
-                if include_result:
-                    filtered_list.append(result)
-            filtered_result_lists.append(filtered_list)
-        
-        # Interleave results from different sources
-        interleaved_results = []
-        max_results = max(len(results) for results in filtered_result_lists) if filtered_result_lists else 0
-        
-        for i in range(max_results):
-            for results in filtered_result_lists:
-                if i < len(results):
-                    interleaved_results.append(results[i])
-        
-        # Remove duplicates (if any)
-        seen_titles = set()
-        unique_results = []
-        
-        for result in interleaved_results:
-            # Use title and source as a simple deduplication key
-            key = f"{result.title}|{result.source}"
-            if key not in seen_titles:
-                seen_titles.add(key)
-                unique_results.append(result)
-        
-        return unique_results
+        predicate = _build_predicate(
+            filters.year_min, filters.year_max,
+            filters.price_min, filters.price_max,
+            filters.location
+        )
+        candidates = filter(predicate, candidates)
+    
+    seen = set()
+    aggregated_results = []
+    
+    for result in candidates:
+        # Use title and source as a simple deduplication key
+        key = (result.title, result.source)
+        if key not in seen:
+            seen.add(key)
+            aggregated_results.append(result)
+    
+    logger.debug(
+        "Kept %d of %d results after filtering and deduplication",
+        len(aggregated_results), sum(map(len, result_lists))
+    )
+    
+    return aggregated_results
+
+# Predicates are cached by filter values, since paging through a search
+# repeats the same filters
+@lru_cache(maxsize=256)
+def _build_predicate(
+    year_min: Optional[int],
+    year_max: Optional[int],
+    price_min: Optional[float],
+    price_max: Optional[float],
+    location: Optional[str]
+) -> Callable[[SearchResult], bool]:
+    """
+    Compile the search filters into a predicate for filter().
+    
+    Unset bounds become infinities, so the predicate makes plain range
+    comparisons instead of None-checking every filter per result. Year and
+    location filters only exclude results that have a year or location to
+    compare; price filters always apply.
     
-    # If no filters applied, just return all results
-    return all_results
+    Args:
+        year_min: Earliest year, if filtered
+        year_max: Latest year, if filtered
+        price_min: Lowest price, if filtered
+        price_max: Highest price, if filtered
+        location: Location substring, if filtered
+        
+    Returns:
+        Function returning True for results that should be kept
+    """
+    if year_min is None:
+        year_min = -math.inf
+    if year_max is None:
+        year_max = math.inf
+    if price_min is None:
+        price_min = -math.inf
+    if price_max is None:
+        price_max = math.inf
+    location = location.lower() if location else None
+    
+    def matches(result: SearchResult) -> bool:
+        year = result.year
+        if year is not None and not year_min <= year <= year_max:
+            return False
+        if location and result.location and location not in result.location.lower():
+            return False
+        return price_min <= result.price <= price_max
+    
+    return matches
 
-def match_query_in_image_text(result: SearchResult, query_terms: List[str]) -> bool:
+def match_query_in_image_text(result: SearchResult, query_pattern: Pattern[str]) -> bool:
     """
     Check if any query terms appear in the image text.
     
     Args:
         result: The search result to check
-        query_terms: List of search terms
+        query_pattern: Compiled alternation of the lowercased search terms
         
     Returns:
         True if any query term appears in the image text
@@ -145,12 +167,7 @@ def match_query_in_image_text(result: SearchResult, query_terms: List[str]) -> b
     if not result.image_text:
         return False
     
-    image_text_lower = result.image_text.lower()
-    for term in query_terms:
-        if term in image_text_lower:
-            return True
-    
-    return False
+    return query_pattern.search(result.image_text.lower()) is not None
 
 def filter_results_by_image_text(results: List[SearchResult], query: str) -> List[SearchResult]:
     """
@@ -169,12 +186,15 @@ def filter_results_by_image_text(results: List[SearchResult], query: str) -> Lis
     if not query_terms:
         return results
     
+    # One regex pass per result instead of one substring scan per term
+    query_pattern = re.compile("|".join(map(re.escape, query_terms)))
+    
     # Separate results with matching image text
     matches = []
     non_matches = []
     
     for result in results:
-        if match_query_in_image_text(result, query_terms):
+        if match_query_in_image_text(result, query_pattern):
             matches.append(result)
         else:
             non_matches.append(result)
@@ -192,10 +212,8 @@ def detect_date_in_text(text: str) -> Optional[str]:
     Returns:
         Detected year or None
     """
-    import re
-    
     # Look for years between 1800 and 2099
-    year_match = re.search(r'\b(18|19|20)\d{2}\b', text)
+    year_match = _YEAR_WORD_RE.search(text)
     if year_match:
         return year_match.group(0)
     
@@ -214,17 +232,8 @@ def detect_location_in_text(text: str) -> Optional[str]:
     # This is a very simplified approach
     # In a real app, you would use a Named Entity Recognition (NER) model
     # or a more sophisticated location detection algorithm
+    location_match = _LOCATION_RE.search(text)
+    if location_match:
+        return _LOCATIONS_BY_LOWER[location_match.group(0).lower()]
     
-    # List of common cities and countries
-    common_locations = [
-        "New York", "Paris", "London", "Tokyo", "Berlin", "Rome", "Madrid",
-        "USA", "France", "UK", "Japan", "Germany", "Italy", "Spain",
-        "Chicago", "San Francisco", "Los Angeles", "Boston", "Washington",
-        "California", "Florida", "Texas", "New Jersey"
-    ]
-    
-    for location in common_locations:
-        if location.lower() in text.lower():
-            return location
-    
-    return None 
\ No newline at end of file
+    return None
\ No newline at end of file
@@ -0,0 +1,26 @@
+import os
+import logging
+import orjson
+
+class JsonLogFormatter(logging.Formatter):
+    """Format log records as one JSON object per line, for CloudWatch and other log indexers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode()
+
+def configure_logging() -> None:
+    """Configure the root logger from LOG_LEVEL (default INFO) and LOG_FORMAT (text or json)."""
+    handler = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[handler])
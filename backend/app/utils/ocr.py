@@ -1,13 +1,115 @@
 import os
 import io
-import httpx
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 import pytesseract
-from typing import Optional
+from typing import List, Optional, Union
+
+from app.services.http_client import get_http_client
+from app.utils.cache import SingleFlight, TTLCache
+
+logger = logging.getLogger(__name__)
 
 # Configure Tesseract path if needed
 # pytesseract.pytesseract.tesseract_cmd = r'/usr/local/bin/tesseract'
 
+# Tesseract is CPU-bound and blocking, so OCR runs in worker processes
+# rather than on the event loop; one per CPU unless OCR_WORKERS is set
+OCR_WORKERS = int(os.getenv("OCR_WORKERS") or os.cpu_count() or 1)
+
+# Tesseract's runtime grows with pixel count, and postcard text reads fine
+# in grayscale at ~1024px, so images are shrunk before OCR
+OCR_MAX_EDGE = 1024
+
+# Largest image body downloaded for OCR; bigger responses are abandoned
+# mid-stream instead of being read into memory
+OCR_MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+# Images with a shorter edge than this are thumbnails or icons without
+# legible text, so they skip OCR
+OCR_MIN_EDGE = 256
+
+# --oem 1: LSTM engine only; --psm 6: treat the image as one uniform block
+# of text, skipping page layout analysis
+TESSERACT_CONFIG = "--oem 1 --psm 6"
+
+# Processed postcard images by URL - the same listing images come up across
+# searches, and a hit skips both the download and Tesseract. Failures and
+# images without text aren't cached, so they are retried.
+OCR_CACHE_SIZE = 1000
+_postcard_cache = TTLCache(maxsize=OCR_CACHE_SIZE)
+
+# Concurrent requests for the same image share one download and OCR run
+_inflight_postcards = SingleFlight()
+
+# Postcard images processed at once - matches the pool size, so downloads
+# for the next images overlap OCR without queueing far ahead of the pool
+_postcard_sem = asyncio.Semaphore(OCR_WORKERS)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Get the OCR process pool, creating it on first use.
+    
+    Returns:
+        Shared ProcessPoolExecutor
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+    return _pool
+
+def shutdown_ocr_pool() -> None:
+    """
+    Shut down the OCR process pool, if one was started.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+def _ocr_sync(image_data: Union[bytes, bytearray]) -> str:
+    """
+    Run Tesseract on a grayscale, downscaled copy of an image. Blocking -
+    runs in the OCR process pool.
+    
+    Args:
+        image_data: Image as bytes or bytearray
+        
+    Returns:
+        Extracted text, stripped
+    """
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            # Let the JPEG decoder scale down and drop color while decoding
+            image.draft("L", (OCR_MAX_EDGE, OCR_MAX_EDGE))
+            image = image.convert("L")
+            image.thumbnail((OCR_MAX_EDGE, OCR_MAX_EDGE), Image.LANCZOS)
+            return pytesseract.image_to_string(image, config=TESSERACT_CONFIG).strip()
+    except Exception as e:
+        # Some pytesseract errors can't be unpickled in the parent process,
+        # which would break the whole pool - send back a plain error instead
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def _is_decorative(image_data: Union[bytes, bytearray]) -> bool:
+    """
+    Check whether an image is too small, or the wrong kind, to carry text.
+    
+    Image.open only parses the header, so this is cheap compared with
+    sending the image to the OCR pool.
+    
+    Args:
+        image_data: Image as bytes or bytearray
+        
+    Returns:
+        True if the image should skip OCR
+    """
+    with Image.open(io.BytesIO(image_data)) as image:
+        return image.format == "GIF" or min(image.size) < OCR_MIN_EDGE
+
 async def extract_text_from_image_url(image_url: str) -> Optional[str]:
     """
     Extract text from an image using OCR.
@@ -19,33 +121,78 @@ async def extract_text_from_image_url(image_url: str) -> Optional[str]:
         Extracted text or None if extraction failed
     """
     try:
-        # Download the image
-        async with httpx.AsyncClient() as client:
-            response = await client.get(image_url)
+        # Stream the image over the shared pooled client into one buffer,
+        # rather than joining the chunks into a second copy afterwards
+        async with get_http_client().stream("GET", image_url) as response:
             if response.status_code != 200:
-                print(f"Failed to download image: {response.status_code}")
+                logger.warning("Failed to download image: %s", response.status_code)
                 return None
             
-            # Load the image
-            image_data = response.content
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Perform OCR
-            text = pytesseract.image_to_string(image)
-            
-            # Clean up the text
-            text = text.strip()
-            
-            return text if text else None
+            image_data = bytearray()
+            async for chunk in response.aiter_bytes(65536):
+                image_data.extend(chunk)
+                if len(image_data) > OCR_MAX_IMAGE_BYTES:
+                    logger.warning("Image at %s exceeds %s bytes, skipping OCR", image_url, OCR_MAX_IMAGE_BYTES)
+                    return None
+        
+        if _is_decorative(image_data):
+            logger.debug("Skipping OCR for decorative image: %s", image_url)
+            return None
+        
+        # Perform OCR in a worker process
+        text = await asyncio.get_running_loop().run_in_executor(_get_pool(), _ocr_sync, image_data)
+        
+        return text if text else None
     
     except Exception as e:
-        print(f"OCR processing error: {str(e)}")
+        logger.warning("OCR processing error: %s", e)
         return None
 
 async def process_postcard_image(image_url: str) -> dict:
     """
     Process a postcard image to extract text and metadata.
     
+    Args:
+        image_url: URL of the postcard image
+        
+    Returns:
+        Dictionary containing extracted text and metadata
+    """
+    cached = _postcard_cache.get(image_url)
+    if cached is not None:
+        return dict(cached)
+    
+    result = await _inflight_postcards.run(image_url, lambda: _process_postcard_image(image_url))
+    if result["text"]:
+        _postcard_cache.set(image_url, result)
+    # Callers get their own copy, so they can't modify the cached entry
+    return dict(result)
+
+async def batch_process_postcard_images(image_urls: List[str]) -> List[dict]:
+    """
+    Process several postcard images concurrently.
+    
+    Args:
+        image_urls: URLs of the postcard images
+        
+    Returns:
+        Dictionaries of extracted text and metadata, in the order of
+        image_urls; images that fail get an empty result
+    """
+    async def process_one(image_url: str) -> dict:
+        async with _postcard_sem:
+            return await process_postcard_image(image_url)
+    
+    results = await asyncio.gather(*(process_one(url) for url in image_urls), return_exceptions=True)
+    return [
+        {"text": "", "date": None, "location": None} if isinstance(result, BaseException) else result
+        for result in results
+    ]
+
+async def _process_postcard_image(image_url: str) -> dict:
+    """
+    Process a postcard image that isn't in the cache.
+    
     Args:
         image_url: URL of the postcard image
         
@@ -74,5 +221,5 @@ async def process_postcard_image(image_url: str) -> dict:
         }
     
     except Exception as e:
-        print(f"Postcard image processing error: {str(e)}")
+        logger.warning("Postcard image processing error: %s", e)
         return {"text": "", "date": None, "location": None} 
\ No newline at end of file
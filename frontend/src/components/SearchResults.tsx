@@ -16,8 +16,9 @@ interface SearchResult {
   date?: string;
   location?: string;
   affiliate_link?: string;
-  image_text?: string;
-  additional_image_text?: string[];
+  image_text?: string | null;
+  additional_image_text?: (string | null)[] | null;
+  ocr_status?: 'pending' | 'done' | 'none';
 }
 
 interface SearchResultsProps {
@@ -47,23 +48,24 @@ export function SearchResults({
   const [error, setError] = useState<string | null>(null);
   const [enhancedQuery, setEnhancedQuery] = useState<string | null>(null);
   const [extractionTimeout, setExtractionTimeout] = useState(false);
+  const [searchId, setSearchId] = useState<string | null>(null);
 
   // Add timeout for extraction
   useEffect(() => {
     const timer = setTimeout(() => {
       setExtractionTimeout(true);
-    }, 10000);  // 10 seconds
+    }, 60000);  // 60 seconds, matching the backend's image processing timeout
 
     return () => clearTimeout(timer);
   }, []);
 
   // Function to standardize text display 
-  const standardizeTextDisplay = (text: string | null | undefined): string => {
+  const standardizeTextDisplay = (text: string | null | undefined, pending: boolean): string => {
     // 1. Still extracting
-    if (text === undefined) return "extracting";
+    if (pending && (text === undefined || text === null)) return "extracting";
     
     // 2. No text found
-    if (text === null || text === "") return "none";
+    if (text === undefined || text === null || text === "") return "none";
     
     // 3. Check for various phrases indicating no text was found
     const noTextPhrases = [
@@ -161,6 +163,7 @@ export function SearchResults({
         setResults(data.results || []);
         setTotal(data.total || 0);
         setEnhancedQuery(data.enhanced_query || null);
+        setSearchId(data.search_id || null);
       } catch (err) {
         console.error('Error fetching search results:', err);
         setError('Failed to fetch search results. Please try again later.');
@@ -174,6 +177,40 @@ export function SearchResults({
     fetchResults();
   }, [query, page, yearMin, yearMax, location, priceMin, priceMax, sortBy]);
 
+  // Image text is extracted after the search returns - poll for it until
+  // every postcard has text or extraction times out
+  useEffect(() => {
+    if (!searchId) return;
+
+    const apiBase = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:9001';
+    const interval = setInterval(async () => {
+      try {
+        const response = await fetch(`${apiBase}/api/search/${searchId}/image-text`, { mode: 'cors' });
+        if (!response.ok) {
+          clearInterval(interval);
+          return;
+        }
+
+        const data = await response.json();
+        const texts: Partial<SearchResult>[] = data.results || [];
+        setResults(prev => prev.map((result, i) => ({ ...result, ...texts[i] })));
+
+        if (texts.every(text => text.ocr_status !== 'pending')) {
+          clearInterval(interval);
+        }
+      } catch (err) {
+        console.error('Error polling for image text:', err);
+        clearInterval(interval);
+      }
+    }, 2000);
+    const stop = setTimeout(() => clearInterval(interval), 60000);
+
+    return () => {
+      clearInterval(interval);
+      clearTimeout(stop);
+    };
+  }, [searchId]);
+
   if (loading) {
     return <div className="text-center py-12">Loading results...</div>;
   }
@@ -269,7 +306,7 @@ export function SearchResults({
                     {/* Front image text */}
                     <div className="mb-2">
                       <span className="font-medium text-xs mr-1">Front:</span>
-                      {renderExtractedText(standardizeTextDisplay(result.image_text))}
+                      {renderExtractedText(standardizeTextDisplay(result.image_text, result.ocr_status === 'pending'))}
                     </div>
                     
                     {/* Back/Additional image text */}
@@ -279,7 +316,8 @@ export function SearchResults({
                         {renderExtractedText(standardizeTextDisplay(
                           result.additional_image_text && result.additional_image_text.length > 0 
                             ? result.additional_image_text[0] 
-                            : undefined
+                            : undefined,
+                          result.ocr_status === 'pending'
                         ))}
                       </div>
                     )}
@@ -289,7 +327,7 @@ export function SearchResults({
                       result.additional_image_text.slice(1).map((text, index) => (
                         <div key={index + 1} className="mb-2">
                           <span className="font-medium text-xs mr-1">Additional {index + 2}:</span>
-                          {renderExtractedText(standardizeTextDisplay(text))}
+                          {renderExtractedText(standardizeTextDisplay(text, result.ocr_status === 'pending'))}
                         </div>
                       ))
                     )}